@@ -17,6 +17,7 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from database_integration import AirQualityDatabase
 from data_processing import DataProcessor
+from result_cache import RESULT_CACHE, cache_key
 
 LABELS = {
     'co_gt': 'CO',
@@ -41,9 +42,9 @@ class CorrelationAnalyzer:
 
     
     def load_data(self):
-        self.db.connect()
-        self.data = self.db.get_data_as_dataframe()
-        self.db.disconnect()
+        with self.db.session():
+            #projection côté serveur: seules les colonnes numériques sont lues
+            self.data = self.db.get_data_as_dataframe(columns=self.numeric_columns)
         
         #garder uniquement les colonnes numériques
         available_cols = [col for col in self.numeric_columns if col in self.data.columns]
@@ -59,7 +60,9 @@ class CorrelationAnalyzer:
         if self.data is None:
             self.load_data()
         
-        self.correlation_matrix = self.data.corr(method='pearson')
+        self.correlation_matrix = RESULT_CACHE.get_or_compute(
+            cache_key(self.data, None, 'corr', method='pearson'),
+            lambda: self.data.corr(method='pearson'))
         print("Pearson Correlation Calculated")
         return self.correlation_matrix
     
@@ -68,7 +71,9 @@ class CorrelationAnalyzer:
         if self.data is None:
             self.load_data()
         
-        self.correlation_matrix = self.data.corr(method='spearman')
+        self.correlation_matrix = RESULT_CACHE.get_or_compute(
+            cache_key(self.data, None, 'corr', method='spearman'),
+            lambda: self.data.corr(method='spearman'))
         print("Spearman Correlation Calculated")
         return self.correlation_matrix
     
@@ -85,10 +90,13 @@ class CorrelationAnalyzer:
         x = self.data[var1].values
         y = self.data[var2].values
         
-        if method == 'pearson':
-            coef, pvalue = stats.pearsonr(x, y)
-        else:
-            coef, pvalue = stats.spearmanr(x, y)
+        def compute():
+            if method == 'pearson':
+                return stats.pearsonr(x, y)
+            return stats.spearmanr(x, y)
+        
+        coef, pvalue = RESULT_CACHE.get_or_compute(
+            cache_key(self.data, (var1, var2), 'corr_pair', method=method), compute)
         
         print(f"Correlation {method} between '{var1}' et '{var2}':")
         print(f"  Coefficient: {coef:.4f}")
@@ -14,10 +14,410 @@ Fonctionnalités:
 
 import pandas as pd
 import numpy as np
-from database_integration import AirQualityDatabase
+import io
+import os
+import shutil
+import tempfile
+import time
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain
+from database_integration import (AirQualityDatabase, dataframe_to_rows, CSV_COLUMN_MAPPING,
+                                  VALUE_COLUMNS, parse_measured_at_series)
+from result_cache import RESULT_CACHE, cache_key, invalidate_results
 import matplotlib.pyplot as plt
 
 
+CSV_VALUE_COLUMNS = ['CO(GT)', 'NO2(GT)', 'T', 'RH']
+
+
+def _fast_csv_engine():
+    #pyarrow lit le CSV sur plusieurs threads; sinon le parseur C de pandas
+    try:
+        import pyarrow  # noqa: F401
+        return 'pyarrow'
+    except ImportError:
+        return 'c'
+
+
+def _finish_fast_frame(data):
+    data = data.rename(columns=CSV_COLUMN_MAPPING)
+    data['measured_at'] = parse_measured_at_series(data['date'], data['time'])
+    return data
+
+
+def read_csv_fast(csv_path, float_dtype='float64', engine=None, chunksize=None):
+    """Lecture projetée et typée du CSV UCI (colonnes de CSV_COLUMN_MAPPING uniquement).
+
+    Les lignes entièrement vides de fin de fichier sont conservées comme avec la
+    lecture complète: clean_data() les écarte. Avec chunksize, renvoie un générateur
+    de DataFrames (parseur C: pyarrow ne lit pas par morceaux).
+    """
+    engine = 'c' if chunksize else engine or _fast_csv_engine()
+    #peu de valeurs distinctes: catégories (mémoire réduite, parsing des seules modalités)
+    dtypes = {'Date': 'category', 'Time': 'category'}
+    dtypes.update({col: float_dtype for col in CSV_VALUE_COLUMNS})
+    
+    data = pd.read_csv(csv_path, sep=';', decimal=',', engine=engine,
+                       usecols=list(CSV_COLUMN_MAPPING), dtype=dtypes, chunksize=chunksize)
+    if chunksize:
+        return (_finish_fast_frame(chunk) for chunk in data)
+    return _finish_fast_frame(data)
+
+
+class _ReservoirSample:
+    #échantillon uniforme de taille bornée (algorithme R, vectorisé par morceau)
+    
+    def __init__(self, size=100_000, seed=0):
+        self.size = size
+        self.values = np.empty(size)
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+    
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        free = max(0, min(self.size - self.count, len(values)))
+        self.values[self.count:self.count + free] = values[:free]
+        
+        rest = values[free:]
+        if len(rest):
+            #l'élément d'indice global i remplace une case tirée dans [0, i]
+            seen = self.count + free + np.arange(len(rest))
+            slots = self.rng.integers(0, seen + 1)
+            keep = slots < self.size
+            self.values[slots[keep]] = rest[keep]
+        self.count += len(values)
+    
+    def median(self):
+        #exacte tant que count <= size
+        if self.count == 0:
+            return np.nan
+        return float(np.median(self.values[:min(self.count, self.size)]))
+
+
+class KLLSketch:
+    """Sketch de quantiles approchés de type KLL (Karnin, Lang, Liberty), mémoire bornée.
+
+    Les valeurs sont accumulées par niveaux (poids 2^h); un niveau plein est trié puis
+    une valeur sur deux (décalage aléatoire) monte au niveau suivant. Taille mémoire
+    O(k log(n/k)); deux sketches se combinent avec merge() (morceaux, processus).
+    Erreur de rang normalisée ~ rank_error() (1.33% pour k=200, confiance 99%);
+    tant qu'aucun compactage n'a eu lieu, les quantiles sont exacts (interpolation
+    linéaire, comme pandas).
+    """
+    
+    def __init__(self, k=200, seed=None):
+        if k < 8:
+            raise ValueError("k must be >= 8")
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.rng = np.random.default_rng(seed)
+    
+    def rank_error(self):
+        #borne empirique de DataSketches pour KLL (requête de rang simple)
+        return 2.296 / self.k ** 0.9723
+    
+    def _capacity(self, level):
+        depth = len(self.levels) - 1 - level
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+    
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) < self._capacity(level):
+                level += 1
+                continue
+            
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            items = np.sort(items)
+            #nombre impair: la dernière valeur reste au niveau courant
+            keep = items[len(items) - len(items) % 2:]
+            promoted = items[:len(items) - len(keep)][self.rng.integers(2)::2]
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate((self.levels[level + 1], promoted))
+            #les capacités dépendent du nombre de niveaux: on repart du bas
+            level = 0
+    
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        self._compress()
+        return self
+    
+    def merge(self, other):
+        if other.k != self.k:
+            raise ValueError("Cannot merge sketches with different k")
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate((self.levels[level], items))
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+    
+    def quantile(self, q):
+        #q scalaire ou liste; NaN si le sketch est vide
+        qs = np.atleast_1d(np.asarray(q, dtype=float))
+        if not self.count:
+            result = np.full(len(qs), np.nan)
+        elif len(self.levels) == 1:
+            result = np.quantile(self.levels[0], qs)
+        else:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(lvl), 2.0 ** h) for h, lvl in enumerate(self.levels)])
+            order = np.argsort(items, kind='stable')
+            items, cumulative = items[order], np.cumsum(weights[order])
+            ranks = np.searchsorted(cumulative, qs * cumulative[-1], side='left')
+            result = items[np.clip(ranks, 0, len(items) - 1)]
+            result = np.where(qs <= 0, self.min, np.where(qs >= 1, self.max, result))
+        return float(result[0]) if np.ndim(q) == 0 else result
+    
+    def iqr_bounds(self, threshold=1.5):
+        q1, q3 = self.quantile([0.25, 0.75])
+        iqr = q3 - q1
+        return q1 - threshold * iqr, q3 + threshold * iqr
+
+
+def _fill_edges(values):
+    #équivalent NumPy de .bfill().ffill() colonne par colonne (tableau 2D, en place)
+    n = len(values)
+    rows = np.arange(n)[:, None]
+    known = ~np.isnan(values)
+    
+    after = np.where(known, rows, n)
+    after = np.minimum.accumulate(after[::-1], axis=0)[::-1]
+    before = np.where(known, rows, -1)
+    before = np.maximum.accumulate(before, axis=0)
+    
+    source = np.where(after < n, after, before)
+    cols = np.broadcast_to(np.arange(values.shape[1]), values.shape)
+    filled = values[np.clip(source, 0, max(n - 1, 0)), cols]
+    values[:] = np.where(source >= 0, filled, np.nan)
+    return values
+
+
+def moving_average_2d(values, window_size=5):
+    """Moyenne mobile centrée de chaque colonne d'un tableau 1D ou 2D (lignes = temps).
+
+    Noyau O(n) par sommes cumulées, toutes colonnes en une passe. Même résultat que
+    rolling(window_size, center=True).mean() puis bfill/ffill: une fenêtre contenant
+    une valeur manquante donne NaN, comblé ensuite par la valeur suivante/précédente.
+    """
+    if window_size < 1:
+        raise ValueError("window_size must be >= 1")
+    
+    values = np.asarray(values, dtype=float)
+    squeeze = values.ndim == 1
+    if squeeze:
+        values = values[:, None]
+    n, k = values.shape
+    
+    result = np.full((n, k), np.nan)
+    if n >= window_size:
+        #centrer chaque colonne limite l'erreur d'arrondi des sommes cumulées
+        known = ~np.isnan(values)
+        shift = np.zeros(k)
+        has_values = known.any(axis=0)
+        shift[has_values] = np.nanmean(values[:, has_values], axis=0)
+        
+        sums = np.zeros((n + 1, k))
+        np.cumsum(np.where(known, values - shift, 0.0), axis=0, out=sums[1:])
+        counts = np.zeros((n + 1, k), dtype=np.int64)
+        np.cumsum(known, axis=0, out=counts[1:])
+        
+        window_sums = sums[window_size:] - sums[:-window_size]
+        complete = (counts[window_size:] - counts[:-window_size]) == window_size
+        means = np.where(complete, window_sums / window_size + shift, np.nan)
+        
+        #la fenêtre finissant en e est attribuée à e - (window_size - 1) // 2 (center=True)
+        start = window_size - 1 - (window_size - 1) // 2
+        result[start:start + len(means)] = means
+    
+    _fill_edges(result)
+    return result[:, 0] if squeeze else result
+
+
+class SortedWindow:
+    """Fenêtre glissante maintenue triée (bisect): insertion/retrait sans retrier.
+
+    La recherche est en O(log w); la médiane et le MAD (k-ième écart absolu, lu
+    dans les deux moitiés triées autour du centre) sont obtenus sans tri.
+    """
+    
+    def __init__(self):
+        self.values = []
+    
+    def __len__(self):
+        return len(self.values)
+    
+    def add(self, value):
+        insort(self.values, value)
+    
+    def remove(self, value):
+        del self.values[bisect_left(self.values, value)]
+    
+    def median(self):
+        m = len(self.values)
+        if not m:
+            return np.nan
+        mid = m // 2
+        if m % 2:
+            return self.values[mid]
+        return (self.values[mid - 1] + self.values[mid]) / 2
+    
+    def _kth_deviation(self, center, split, k):
+        #k-ième (0-based) plus petit |v - center|: fusion implicite des écarts à gauche
+        #(center - v, lus à rebours) et à droite (v - center), par recherche dichotomique
+        values = self.values
+        n_left, n_right = split, len(values) - split
+        left = lambda j: center - values[split - 1 - j]
+        right = lambda j: values[split + j] - center
+        
+        need = k + 1
+        lo, hi = max(0, need - n_right), min(need, n_left)
+        while lo < hi:
+            i = (lo + hi) // 2
+            if left(i) < right(need - i - 1):
+                lo = i + 1
+            else:
+                hi = i
+        
+        candidates = []
+        if lo > 0:
+            candidates.append(left(lo - 1))
+        if need - lo > 0:
+            candidates.append(right(need - lo - 1))
+        return max(candidates)
+    
+    def mad(self, center=None):
+        #écart absolu médian autour de center (médiane de la fenêtre par défaut)
+        m = len(self.values)
+        if not m:
+            return np.nan
+        if center is None:
+            center = self.median()
+        split = bisect_left(self.values, center)
+        mid = m // 2
+        if m % 2:
+            return self._kth_deviation(center, split, mid)
+        return (self._kth_deviation(center, split, mid - 1)
+                + self._kth_deviation(center, split, mid)) / 2
+
+
+def _sliding_windows(values, window_size):
+    #parcourt les fenêtres centrées (convention center=True de pandas, tronquées aux bords)
+    #et renvoie pour chaque position la fenêtre triée courante (valeurs NaN ignorées)
+    if window_size < 1:
+        raise ValueError("window_size must be >= 1")
+    
+    n = len(values)
+    after = (window_size - 1) // 2
+    window = SortedWindow()
+    
+    for end in range(min(after, n)):
+        if values[end] == values[end]:
+            window.add(values[end])
+    
+    for i in range(n):
+        end = i + after
+        if end < n and values[end] == values[end]:
+            window.add(values[end])
+        start = end - window_size
+        if start >= 0 and values[start] == values[start]:
+            window.remove(values[start])
+        yield i, window
+
+
+def rolling_median(values, window_size=5):
+    """Médiane glissante centrée en O(n log w), comme rolling(center=True, min_periods=1).median()."""
+    values = np.asarray(values, dtype=float)
+    result = np.empty(len(values))
+    plain = values.tolist()
+    for i, window in _sliding_windows(plain, window_size):
+        result[i] = window.median()
+    return result
+
+
+def hampel_filter(values, window_size=7, n_sigmas=3.0, return_mask=False):
+    """Filtre de Hampel: remplace par la médiane locale les points s'écartant de plus de
+    n_sigmas * 1.4826 * MAD de celle-ci (fenêtre centrée, tronquée aux bords).
+
+    Avec return_mask=True renvoie aussi le masque des points remplacés.
+    """
+    values = np.asarray(values, dtype=float)
+    result = values.copy()
+    replaced = np.zeros(len(values), dtype=bool)
+    plain = values.tolist()
+    
+    scale = n_sigmas * 1.4826
+    
+    for i, window in _sliding_windows(plain, window_size):
+        median = window.median()
+        deviation = abs(plain[i] - median)
+        if not deviation > 0:
+            continue
+        
+        m = len(window)
+        if m % 2 and scale > 0:
+            #fenêtre impaire: MAD < deviation / scale <=> plus de m // 2 écarts sous ce seuil,
+            #soit deux recherches dichotomiques au lieu du calcul du MAD
+            limit = deviation / scale
+            inside = (bisect_left(window.values, median + limit)
+                      - bisect_right(window.values, median - limit))
+            spike = inside > m // 2
+        else:
+            spike = deviation > scale * window.mad(median)
+        
+        if spike:
+            result[i] = median
+            replaced[i] = True
+    
+    if return_mask:
+        return result, replaced
+    return result
+
+
+def _context_start(raw, kept_index, start):
+    #début du contexte: recule start tant qu'une colonne y commence par une valeur manquante
+    positions = raw.index[raw.index.isin(kept_index)].to_numpy()
+    valid = {}
+    for col in VALUE_COLUMNS:
+        if col in raw.columns:
+            values = pd.to_numeric(raw.loc[positions, col], errors='coerce').to_numpy()
+            valid[col] = ~np.isnan(values) & (values != -200)
+    
+    moved = True
+    while moved:
+        moved = False
+        first = np.searchsorted(positions, start)
+        for is_valid in valid.values():
+            window = is_valid[first:]
+            #colonne manquante en tête de contexte: reculer jusqu'à sa dernière valeur valide
+            if len(window) and not window[0]:
+                before = np.flatnonzero(is_valid[:first])
+                if len(before):
+                    start = positions[before[-1]]
+                    first = before[-1]
+                    moved = True
+    return start
+
+
+def _csv_chunk_factory(csv_path, chunksize):
+    return lambda: read_csv_fast(csv_path, chunksize=chunksize)
+
+
 class DataProcessor:
     #classe pour le chargement et filtrage des données
     
@@ -27,38 +427,133 @@ class DataProcessor:
         self.data = None
         self.cleaned_data = None
     
-    def load_data_from_csv(self, csv_path):
+    def load_data_from_csv(self, csv_path, fast=False, float_dtype='float64'):
+        """Charge le CSV UCI.
 
-        self.data = pd.read_csv(csv_path, sep=';', decimal=',')
-        self.data = self.data.dropna(axis=1, how='all')
+        fast=True ne lit que les six colonnes utilisées, avec des types explicites
+        (float_dtype pour les mesures) et le moteur pyarrow multithreadé s'il est
+        installé; Date/Time sont combinés dès la lecture en une colonne measured_at.
+        """
+        #nouvel import: les résultats mémorisés ne sont plus valides
+        invalidate_results()
         
-        column_mapping = {
-            'Date': 'date',
-            'Time': 'time',
-            'CO(GT)': 'co_gt',
-            'NO2(GT)': 'no2_gt',
-            'T': 'temperature',
-            'RH': 'humidity',
-        }
-        self.data = self.data.rename(columns=column_mapping)
+        if fast:
+            self.data = read_csv_fast(csv_path, float_dtype=float_dtype)
+        else:
+            self.data = pd.read_csv(csv_path, sep=';', decimal=',')
+            self.data = self.data.dropna(axis=1, how='all')
+            
+            self.data = self.data.rename(columns=CSV_COLUMN_MAPPING)
         
         print(f" Data Loaded: {len(self.data)} Records")
         print(f" Columns: {list(self.data.columns)}")
         return self.data
     
+    def load_data_incremental(self, csv_path, context_rows=24, store=True):
+        """Import incrémental des lignes ajoutées depuis le dernier import (repère dans import_watermarks).
+
+        store=False: aperçu, rien n'est écrit et le repère n'avance pas.
+        """
+        file_path = os.path.abspath(csv_path)
+        
+        with self.db.session():
+            self.db.create_tables()
+            mark = self.db.get_import_watermark(file_path)
+        
+        with open(file_path, 'rb') as f:
+            header = f.readline()
+            offset = mark['byte_offset'] if mark else f.tell()
+            
+            #fichier remplacé ou tronqué: on repart du début
+            if offset > os.path.getsize(file_path):
+                print(" File Shrank Since Last Import, Restarting From the Beginning")
+                mark = None
+                offset = len(header)
+            
+            f.seek(offset)
+            tail = f.read()
+        
+        #ne garder que les lignes complètes (une ligne en cours d'écriture attendra)
+        tail = tail[:tail.rfind(b'\n') + 1]
+        if not tail.strip():
+            print(" No New Lines Since Last Import")
+            self.data = self.cleaned_data = pd.DataFrame()
+            return self.cleaned_data
+        invalidate_results()
+        
+        #lignes non vides uniquement: l'index du DataFrame lu est la position dans `lines`
+        context = mark['context_lines'].encode('latin-1') if mark else b''
+        is_blank = lambda line: not line.strip(b'; \r')
+        lines = [line for line in context.splitlines() if not is_blank(line)]
+        n_context = len(lines)
+        lines += [line for line in tail.splitlines() if not is_blank(line)]
+        
+        raw = pd.read_csv(io.BytesIO(header + b'\n'.join(lines) + b'\n'), sep=';', decimal=',')
+        #seules les colonnes sans nom (séparateurs finaux) sont retirées:
+        #une colonne vide sur la seule fin de fichier doit être conservée
+        raw = raw.loc[:, ~raw.columns.str.startswith('Unnamed')]
+        raw = raw.rename(columns=CSV_COLUMN_MAPPING)
+        
+        #protection contre une ligne déjà importée (réécriture partielle du fichier)
+        measured_at = parse_measured_at_series(raw['date'], raw['time'])
+        is_context = np.arange(len(raw)) < n_context
+        if mark and mark['last_measured_at'] is not None:
+            already = (~is_context) & (measured_at <= pd.Timestamp(mark['last_measured_at'])).to_numpy()
+            raw = raw[~already]
+            measured_at = measured_at[~already]
+            is_context = is_context[~already]
+        
+        #nettoyage contexte + nouvelles lignes
+        self.data = raw
+        cleaned = self.clean_data()
+        new_rows = cleaned.index >= n_context
+        self.data = raw[~is_context]
+        
+        print(f" Incremental Import: {len(tail)} New Bytes, "
+              f"{int(new_rows.sum())} New Cleaned Records")
+        
+        if store:
+            if len(cleaned):
+                #contexte compris: upsert n'écrit que les lignes nouvelles ou modifiées
+                self.cleaned_data = cleaned
+                self.store_cleaned_data(upsert=True)
+            
+            start = _context_start(raw, cleaned.index, max(len(lines) - context_rows, 0))
+            next_context = [lines[i] for i in raw.index if i >= start]
+            
+            new_times = measured_at[~is_context].dropna()
+            last_measured_at = (new_times.max().to_pydatetime() if len(new_times)
+                                else mark['last_measured_at'] if mark else None)
+            
+            with self.db.session():
+                self.db.set_import_watermark(
+                    file_path, offset + len(tail), last_measured_at,
+                    b'\n'.join(next_context).decode('latin-1') + '\n' if next_context else ''
+                )
+        
+        self.cleaned_data = cleaned[new_rows]
+        return self.cleaned_data
+    
     def load_data_from_database(self):
 
-        self.db.connect()
-        self.data = self.db.get_data_as_dataframe()
-        self.db.disconnect()
+        with self.db.session():
+            self.data = self.db.get_data_as_dataframe()
         print(f" Data Loaded from Database: {len(self.data)} Records")
         return self.data
     
-    def clean_data(self):
+    def clean_data(self, inplace=False):
+        """Nettoyage: sentinelles -200, lignes trop incomplètes, interpolation, médiane.
 
+        inplace=True travaille sans copie du DataFrame: les colonnes numériques sont
+        extraites une seule fois dans un bloc float contigu, traité par passes NumPy,
+        puis réécrites. self.data est alors remplacé par le résultat (cleaned_data).
+        """
         if self.data is None:
             raise ValueError("No Data Loaded. Use load_data_from_csv() or load_data_from_database().")
         
+        if inplace:
+            return self._clean_data_inplace()
+        
         self.cleaned_data = self.data.copy()
         
         numeric_cols = ['co_gt','no2_gt',
@@ -95,6 +590,182 @@ class DataProcessor:
         
         return self.cleaned_data
     
+    def _clean_data_inplace(self):
+        #version sans copie de clean_data(): un seul bloc (lignes x colonnes) en ordre Fortran
+        data = self.data
+        numeric_cols = [col for col in VALUE_COLUMNS if col in data.columns]
+        other_cols = [col for col in data.columns if col not in numeric_cols]
+        
+        #même règle que dropna(thresh=...), évaluée colonne par colonne sans copier le DataFrame
+        present = np.zeros(len(data), dtype=np.int64)
+        for col in numeric_cols:
+            values = data[col].to_numpy(dtype=float)
+            present += ~(np.isnan(values) | (values == -200))
+        missing_before = len(numeric_cols) * len(data) - int(present.sum())
+        for col in other_cols:
+            present += data[col].notna().to_numpy()
+        keep = present >= len(data.columns) - len(numeric_cols) * 0.5
+        del present
+        
+        #les lignes conservées sont copiées directement dans le bloc
+        block = np.empty((int(keep.sum()), len(numeric_cols)), order='F')
+        for j, col in enumerate(numeric_cols):
+            np.compress(keep, data[col].to_numpy(dtype=float), out=block[:, j])
+        block[block == -200] = np.nan
+        
+        for j in range(block.shape[1]):
+            values = block[:, j]
+            known = np.flatnonzero(~np.isnan(values))
+            if len(known) in (0, len(values)):
+                continue
+            
+            #interpolation linéaire par position; après la dernière valeur: dernière valeur
+            gaps = np.flatnonzero(np.isnan(values[known[0]:])) + known[0]
+            values[gaps] = np.interp(gaps, known, values[known])
+            
+            #seules les valeurs manquantes de tête restent: médiane
+            if known[0]:
+                values[:known[0]] = np.median(values[known[0]:])
+        
+        #le bloc est repris tel quel (copy=False), seules les colonnes non numériques sont filtrées
+        numeric = pd.DataFrame(block, index=data.index[keep], columns=numeric_cols, copy=False)
+        data = pd.concat([data.loc[keep, other_cols], numeric], axis=1)[list(data.columns)]
+        
+        self.data = self.cleaned_data = data
+        
+        print(f" Data Cleaned (In Place):")
+        print(f"  - Missing Values Before: {missing_before}")
+        print(f"  - Missing Values After: {int(np.isnan(block).sum())}")
+        print(f"  - Remaining Records: {len(data)}")
+        
+        return self.cleaned_data
+    
+    def _clean_stream(self, chunks, medians=None, sample=None, max_carry=10_000, stats=None):
+        #mêmes étapes que clean_data(), morceau par morceau; les lignes en attente
+        #d'une valeur valide sont retenues (au plus max_carry)
+        numeric_cols = None
+        anchors = {}  #colonne -> (position, valeur) de la dernière valeur émise
+        pending = None
+        position = 0  #position globale de la première ligne retenue
+        
+        #None marque la fin du flux: les valeurs manquantes finales prennent la dernière valeur
+        for chunk in chain(chunks, [None]):
+            if chunk is None:
+                if pending is None or not len(pending):
+                    break
+                buffer, final = pending, True
+            else:
+                if numeric_cols is None:
+                    numeric_cols = [col for col in VALUE_COLUMNS if col in chunk.columns]
+                
+                chunk = chunk.copy()
+                chunk[numeric_cols] = chunk[numeric_cols].replace(-200, np.nan)
+                if stats is not None:
+                    stats['missing_before'] += int(chunk[numeric_cols].isnull().sum().sum())
+                
+                threshold = len(numeric_cols) * 0.5
+                chunk = chunk.dropna(thresh=len(chunk.columns) - threshold)
+                buffer = chunk if pending is None else pd.concat([pending, chunk])
+                final = False
+            
+            positions = position + np.arange(len(buffer))
+            cut = len(buffer)
+            values, tails = {}, {}
+            
+            for col in numeric_cols:
+                v = buffer[col].to_numpy(dtype=float, copy=True)
+                missing = np.isnan(v)
+                xs, ys = positions[~missing], v[~missing]
+                if col in anchors:
+                    xs = np.concatenate(([anchors[col][0]], xs))
+                    ys = np.concatenate(([anchors[col][1]], ys))
+                
+                if len(xs):
+                    inner = missing & (positions > xs[0]) & (positions < xs[-1])
+                    v[inner] = np.interp(positions[inner], xs, ys)
+                    tail = missing & (positions > xs[-1])
+                    if tail.any():
+                        tails[col] = (tail, ys[-1])
+                        cut = min(cut, max(0, int(xs[-1] - position) + 1))
+                values[col] = v
+            
+            #fin du flux, ou valeur manquante trop longue: on complète au lieu d'attendre
+            if final or len(buffer) - cut > max_carry:
+                for col, (tail, last) in tails.items():
+                    values[col][tail] = last
+                cut = len(buffer)
+            
+            if cut:
+                out = buffer.iloc[:cut].copy()
+                for col, v in values.items():
+                    done = v[:cut]
+                    known = np.flatnonzero(~np.isnan(done))
+                    if len(known):
+                        anchors[col] = (positions[known[-1]], done[known[-1]])
+                    if sample is not None:
+                        sample[col].update(done[known])
+                    out[col] = done if medians is None else np.where(np.isnan(done), medians[col], done)
+                yield out
+            
+            pending = buffer.iloc[cut:]
+            position += cut
+    
+    def _chunk_factory(self, source, chunksize):
+        #source: chemin CSV, None (table des mesures) ou fabrique d'itérateurs de DataFrames
+        if isinstance(source, str):
+            return _csv_chunk_factory(source, chunksize)
+        if source is None:
+            return lambda: self.db.iter_dataframe_chunks(chunksize=chunksize)
+        return source
+    
+    def iter_clean_chunks(self, chunk_factory, sample_size=100_000, max_carry=10_000, stats=None):
+        """Nettoyage hors mémoire: générateur de morceaux nettoyés.
+
+        chunk_factory() doit renvoyer un nouvel itérateur de DataFrames à chaque appel:
+        la source est lue deux fois. La première passe estime la médiane de chaque
+        colonne (exacte jusqu'à sample_size valeurs, échantillon uniforme au-delà),
+        la seconde produit les morceaux avec les valeurs manquantes restantes remplies.
+        """
+        sample = {col: _ReservoirSample(sample_size) for col in VALUE_COLUMNS}
+        for _ in self._clean_stream(chunk_factory(), sample=sample, max_carry=max_carry):
+            pass
+        medians = {col: reservoir.median() for col, reservoir in sample.items()}
+        
+        yield from self._clean_stream(chunk_factory(), medians=medians,
+                                      max_carry=max_carry, stats=stats)
+    
+    def clean_data_chunked(self, source=None, chunksize=50_000, store=True, batch_size=5000,
+                           swap=False, sample_size=100_000, max_carry=10_000):
+        """Nettoie une source trop grosse pour la mémoire (chemin CSV, base si None,
+        ou fabrique de morceaux) avec les étapes de clean_data().
+
+        store=True écrit les morceaux nettoyés dans la base au fil de l'eau (remplacement
+        de la table, comme store_cleaned_data) et renvoie le nombre de lignes: la mémoire
+        reste bornée par chunksize. store=False rassemble le résultat dans cleaned_data.
+        """
+        chunk_factory = self._chunk_factory(source, chunksize)
+        
+        stats = {'missing_before': 0}
+        chunks = self.iter_clean_chunks(chunk_factory, sample_size=sample_size,
+                                        max_carry=max_carry, stats=stats)
+        
+        start = time.perf_counter()
+        if store:
+            rows = (row for chunk in chunks for row in dataframe_to_rows(chunk))
+            with self.db.session():
+                self.db.create_tables()
+                count = self.db.replace_measurements(rows, batch_size=batch_size, swap=swap)
+        else:
+            self.cleaned_data = pd.concat(list(chunks))
+            count = len(self.cleaned_data)
+        elapsed = time.perf_counter() - start
+        
+        rate = count / elapsed if elapsed > 0 else float('inf')
+        print(f" Data Cleaned in Chunks of {chunksize}:")
+        print(f"  - Missing Values Before: {stats['missing_before']}")
+        print(f"  - Remaining Records: {count} ({rate:.0f} rows/s)")
+        return count
+    
     def apply_moving_average(self, column, window_size=5):
      
         if self.cleaned_data is None:
@@ -103,14 +774,86 @@ class DataProcessor:
         if column not in self.cleaned_data.columns:
             raise ValueError(f"Column '{column}' Not Found.")
         
-        filtered = self.cleaned_data[column].rolling(window=window_size, center=True).mean()
-        
-        #remplir les valeurs NaN aux extrémités
-        filtered = filtered.fillna(method='bfill').fillna(method='ffill')
+        #moyenne centrée, valeurs NaN aux extrémités remplies (bfill puis ffill)
+        series = self.cleaned_data[column]
+        filtered = RESULT_CACHE.get_or_compute(
+            cache_key(self.cleaned_data, column, 'moving_average', window_size=window_size),
+            lambda: pd.Series(moving_average_2d(series.to_numpy(), window_size),
+                              index=series.index, name=column))
         
         print(f"Moving Average Applied on '{column}' (fenêtre={window_size})")
         return filtered
     
+    def apply_moving_average_batch(self, columns=None, window_size=5, by=None, return_array=False):
+        """Moyenne mobile centrée de plusieurs colonnes en un seul appel vectorisé.
+
+        columns: liste de colonnes (par défaut toutes les colonnes numériques mesurées).
+        by: colonne de regroupement (ex. 'station'), les fenêtres ne franchissent pas
+        les frontières de groupe. Renvoie un DataFrame aligné sur cleaned_data, ou le
+        tableau 2D (lignes x colonnes) avec return_array=True.
+        """
+        if self.cleaned_data is None:
+            self.clean_data()
+        
+        if columns is None:
+            columns = [col for col in VALUE_COLUMNS if col in self.cleaned_data.columns]
+        missing = [col for col in columns if col not in self.cleaned_data.columns]
+        if missing:
+            raise ValueError(f"Column '{missing[0]}' Not Found.")
+        
+        def compute():
+            values = self.cleaned_data[columns].to_numpy(dtype=float)
+            if by is None:
+                return moving_average_2d(values, window_size)
+            filtered = np.empty_like(values)
+            for rows in self.cleaned_data.groupby(by, sort=False).indices.values():
+                filtered[rows] = moving_average_2d(values[rows], window_size)
+            return filtered
+        
+        filtered = RESULT_CACHE.get_or_compute(
+            cache_key(self.cleaned_data, columns, 'moving_average_batch',
+                      window_size=window_size, by=by), compute)
+        
+        print(f"Moving Average Applied on {len(columns)} Columns (fenêtre={window_size})")
+        if return_array:
+            return filtered
+        return pd.DataFrame(filtered, index=self.cleaned_data.index, columns=columns)
+    
+    def apply_rolling_median(self, column, window_size=5):
+        
+        if self.cleaned_data is None:
+            self.clean_data()
+        
+        if column not in self.cleaned_data.columns:
+            raise ValueError(f"Column '{column}' Not Found.")
+        
+        series = self.cleaned_data[column]
+        filtered = RESULT_CACHE.get_or_compute(
+            cache_key(self.cleaned_data, column, 'rolling_median', window_size=window_size),
+            lambda: pd.Series(rolling_median(series.to_numpy(), window_size),
+                              index=series.index, name=column))
+        
+        print(f"Rolling Median Applied on '{column}' (fenêtre={window_size})")
+        return filtered
+    
+    def apply_hampel_filter(self, column, window_size=7, n_sigmas=3.0):
+        #débruitage local: les pics sont remplacés, aucune ligne n'est supprimée
+        if self.cleaned_data is None:
+            self.clean_data()
+        
+        if column not in self.cleaned_data.columns:
+            raise ValueError(f"Column '{column}' Not Found.")
+        
+        series = self.cleaned_data[column]
+        values, replaced = RESULT_CACHE.get_or_compute(
+            cache_key(self.cleaned_data, column, 'hampel', window_size=window_size, n_sigmas=n_sigmas),
+            lambda: hampel_filter(series.to_numpy(), window_size, n_sigmas, return_mask=True))
+        filtered = pd.Series(values, index=series.index, name=column)
+        
+        print(f" Hampel Filter Applied on '{column}' (fenêtre={window_size}, n_sigmas={n_sigmas}):")
+        print(f"  - Spikes Replaced: {int(replaced.sum())}")
+        return filtered
+    
     def apply_threshold_filter(self, column, min_value=None, max_value=None):
         
         if self.cleaned_data is None:
@@ -119,14 +862,16 @@ class DataProcessor:
         if column not in self.cleaned_data.columns:
             raise ValueError(f"Column '{column}' Not Found.")
         
-        filtered_data = self.cleaned_data.copy()
+        #un seul masque booléen: seule la sélection finale est copiée
+        values = self.cleaned_data[column].to_numpy()
+        mask = np.ones(len(values), dtype=bool)
         
         if min_value is not None:
-            filtered_data = filtered_data[filtered_data[column] >= min_value]
+            mask &= values >= min_value
         
         if max_value is not None:
-            filtered_data = filtered_data[filtered_data[column] <= max_value]
-        filtered_data = filtered_data.reset_index(drop=True)
+            mask &= values <= max_value
+        filtered_data = self.cleaned_data[mask].reset_index(drop=True)
         
         print(f" Threshold Filter Applied on '{column}':")
         print(f"  - Min: {min_value}, Max: {max_value}")
@@ -134,26 +879,35 @@ class DataProcessor:
         
         return filtered_data
     
-    def remove_outliers(self, column, method='iqr', threshold=1.5):
+    def remove_outliers(self, column, method='iqr', threshold=1.5, approximate=False, sketch_k=200):
+        """Supprime les valeurs aberrantes (méthode 'iqr' ou 'zscore').
 
+        approximate=True calcule les quartiles IQR avec un KLLSketch (voir
+        remove_outliers_chunked pour les données hors mémoire).
+        """
         if self.cleaned_data is None:
             self.clean_data()
         
-        data = self.cleaned_data.copy()
+        data = self.cleaned_data
         original_len = len(data)
         
+        #les bornes sont calculées sur la colonne seule, puis un masque unique est appliqué
+        series = data[column]
         if method == 'iqr':
-            Q1 = data[column].quantile(0.25)
-            Q3 = data[column].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - threshold * IQR
-            upper_bound = Q3 + threshold * IQR
-            data = data[(data[column] >= lower_bound) & (data[column] <= upper_bound)]
+            if approximate:
+                lower_bound, upper_bound = KLLSketch(sketch_k).update(series.to_numpy()).iqr_bounds(threshold)
+            else:
+                Q1 = series.quantile(0.25)
+                Q3 = series.quantile(0.75)
+                IQR = Q3 - Q1
+                lower_bound = Q1 - threshold * IQR
+                upper_bound = Q3 + threshold * IQR
+            data = data[(series >= lower_bound) & (series <= upper_bound)]
             
         elif method == 'zscore':
-            mean = data[column].mean()
-            std = data[column].std()
-            data = data[abs((data[column] - mean) / std) <= threshold]
+            mean = series.mean()
+            std = series.std()
+            data = data[abs((series - mean) / std) <= threshold]
         
         removed = original_len - len(data)
         print(f" Outliers Removed from'{column}' (méthode={method}):")
@@ -162,6 +916,40 @@ class DataProcessor:
         
         return data
     
+    def _cleaned_chunk_factory(self, source, chunksize):
+        #la table des mesures (source None) est déjà nettoyée; les autres sources passent par iter_clean_chunks
+        if source is None:
+            return self._chunk_factory(source, chunksize)
+        chunk_factory = self._chunk_factory(source, chunksize)
+        return lambda: self.iter_clean_chunks(chunk_factory)
+    
+    def column_sketch(self, column, source=None, chunksize=50_000, sketch_k=200):
+        """KLLSketch de la colonne nettoyée, lue morceau par morceau (CSV, base si None, fabrique).
+
+        Les sketches construits séparément se combinent avec KLLSketch.merge().
+        """
+        sketch = KLLSketch(sketch_k)
+        for chunk in self._cleaned_chunk_factory(source, chunksize)():
+            sketch.update(chunk[column].to_numpy(dtype=float))
+        return sketch
+    
+    def remove_outliers_chunked(self, column, source=None, threshold=1.5, chunksize=50_000,
+                                sketch_k=200, sketch=None):
+        """Version hors mémoire de remove_outliers(method='iqr'): générateur de morceaux nettoyés filtrés.
+
+        Bornes IQR depuis un KLLSketch (erreur au plus sketch.rank_error() en rang).
+        """
+        if sketch is None:
+            sketch = self.column_sketch(column, source, chunksize, sketch_k)
+        lower_bound, upper_bound = sketch.iqr_bounds(threshold)
+        
+        print(f" IQR Bounds for '{column}' (KLL, k={sketch.k}, ±{sketch.rank_error():.2%} rank): "
+              f"[{lower_bound:.3f}, {upper_bound:.3f}]")
+        
+        for chunk in self._cleaned_chunk_factory(source, chunksize)():
+            values = chunk[column]
+            yield chunk[(values >= lower_bound) & (values <= upper_bound)]
+    
     def get_summary_statistics(self):
      
         if self.cleaned_data is None:
@@ -173,41 +961,28 @@ class DataProcessor:
         print("Descriptive Statistics Calculated")
         return stats
     
-    def store_cleaned_data(self):
+    def store_cleaned_data(self, batch_size=5000, swap=False, upsert=False):
 
         if self.cleaned_data is None:
             self.clean_data()
         
-        self.db.connect()
-        
-        self.db.create_tables()
-        
-        self.db.cursor.execute("DELETE FROM air_quality_measurements")
-        
-        #insérer les données nettoyées
-        count = 0
-        for _, row in self.cleaned_data.iterrows():
-            try:
-                self.db.cursor.execute('''
-                    INSERT INTO air_quality_measurements 
-                    (date, time, co_gt, no2_gt, 
-                     temperature, humidity)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                ''', (
-                    row.get('date'), row.get('time'), 
-                    None if pd.isna(row.get('co_gt')) else row.get('co_gt'),
-                    None if pd.isna(row.get('no2_gt')) else row.get('no2_gt'),
-                    None if pd.isna(row.get('temperature')) else row.get('temperature'),
-                    None if pd.isna(row.get('humidity')) else row.get('humidity')
-                ))
-                count += 1
-            except Exception as e:
-                print(f"Error: {e}")
-        
-        self.db.connection.commit()
-        self.db.disconnect()
-        
-        print(f"{count} Cleaned Records Stored in the Database")
+        start = time.perf_counter()
+        with self.db.session():
+            self.db.create_tables()
+            if upsert:
+                #réimport: seules les lignes nouvelles ou modifiées sont écrites
+                count = self.db.upsert_measurements(self.cleaned_data, batch_size=batch_size)['written']
+            else:
+                #conversion vectorisée du DataFrame en tuples, une seule fois
+                rows = dataframe_to_rows(self.cleaned_data)
+                
+                #insérer les données nettoyées par lots (staging + swap si demandé)
+                count = self.db.replace_measurements(rows, batch_size=batch_size, swap=swap)
+        elapsed = time.perf_counter() - start
+        
+        rate = count / elapsed if elapsed > 0 else float('inf')
+        print(f"{count} Cleaned Records Stored in the Database ({rate:.0f} rows/s)")
+        return count
     
     def visualize_filtering_effect(self, column, window_size=10, save_path=None):
         
@@ -242,6 +1017,174 @@ class DataProcessor:
         plt.show()
 
 
+#FILTRES EN FLUX (capteurs en direct)
+
+class StreamingMovingAverage:
+    """Moyenne mobile centrée échantillon par échantillon (tampon circulaire + somme de Kahan).
+
+    update() accepte une valeur ou un micro-lot et renvoie les sorties devenues
+    définitives (une sortie centrée attend (window_size - 1) // 2 échantillons);
+    flush() termine le flux. La concaténation des sorties est égale, à l'arrondi près,
+    à apply_moving_average() sur les mêmes données (bfill/ffill compris).
+    """
+    
+    def __init__(self, window_size=5):
+        if window_size < 1:
+            raise ValueError("window_size must be >= 1")
+        self.window_size = window_size
+        self.reset()
+    
+    def reset(self):
+        self.buffer = np.empty(self.window_size)
+        self.seen = 0
+        self.emitted = 0
+        self.waiting = 0       #sorties NaN en attente de la prochaine moyenne valide (bfill)
+        self.last_mean = np.nan
+        self._sum = 0.0
+        self._compensation = 0.0
+        self._nan_count = 0
+    
+    def _add(self, value):
+        #somme compensée (Kahan) pour éviter la dérive des ajouts/retraits successifs
+        y = value - self._compensation
+        t = self._sum + y
+        self._compensation = (t - self._sum) - y
+        self._sum = t
+    
+    def update(self, values):
+        w = self.window_size
+        out = []
+        for value in np.atleast_1d(np.asarray(values, dtype=float)):
+            slot = self.seen % w
+            if self.seen >= w:
+                old = self.buffer[slot]
+                if old != old:
+                    self._nan_count -= 1
+                else:
+                    self._add(-old)
+            
+            self.buffer[slot] = value
+            if value != value:
+                self._nan_count += 1
+            else:
+                self._add(value)
+            self.seen += 1
+            
+            if self.seen < w:
+                continue
+            if self.seen == w:
+                #sorties de tête sans fenêtre complète: remplies par la première moyenne
+                self.waiting += w - 1 - (w - 1) // 2
+            
+            if self._nan_count:
+                self.waiting += 1
+            else:
+                mean = self._sum / w
+                out.extend([mean] * (self.waiting + 1))
+                self.waiting = 0
+                self.last_mean = mean
+        
+        self.emitted += len(out)
+        return np.array(out)
+    
+    def flush(self):
+        #sorties restantes: dernière moyenne valide (ffill), NaN s'il n'y en a eu aucune
+        out = np.full(self.seen - self.emitted, self.last_mean)
+        self.emitted = self.seen
+        return out
+
+
+class _StreamingRowFilter:
+    #filtre ligne à ligne: mask() met à jour l'état, update() renvoie les lignes conservées
+    
+    def __init__(self, column=None):
+        self.column = column
+        self.seen = 0
+        self.kept = 0
+    
+    def _values(self, batch):
+        if isinstance(batch, pd.DataFrame):
+            return batch[self.column].to_numpy(dtype=float)
+        return np.atleast_1d(np.asarray(batch, dtype=float))
+    
+    def update(self, batch):
+        mask = self.mask(batch)
+        self.seen += len(mask)
+        self.kept += int(mask.sum())
+        if isinstance(batch, (pd.DataFrame, pd.Series)):
+            return batch[mask]
+        return np.atleast_1d(np.asarray(batch, dtype=float))[mask]
+
+
+class StreamingThresholdFilter(_StreamingRowFilter):
+    """Équivalent en flux de apply_threshold_filter (bornes incluses).
+
+    Comme dans apply_threshold_filter, les NaN ne sont rejetés que si une borne est
+    fixée (toute comparaison avec NaN est fausse); sans borne tout est conservé.
+
+    Les micro-lots peuvent être des tableaux ou des DataFrames (column requis).
+    """
+    
+    def __init__(self, min_value=None, max_value=None, column=None):
+        super().__init__(column)
+        self.min_value = min_value
+        self.max_value = max_value
+    
+    def mask(self, batch):
+        values = self._values(batch)
+        mask = np.ones(len(values), dtype=bool)
+        if self.min_value is not None:
+            mask &= values >= self.min_value
+        if self.max_value is not None:
+            mask &= values <= self.max_value
+        return mask
+
+
+class StreamingOutlierFilter(_StreamingRowFilter):
+    """Détection d'aberrations en ligne par z-score (moyenne/variance de Welford).
+
+    Chaque valeur est comparée aux statistiques des valeurs précédentes, puis les
+    met à jour; les warmup premières valeurs sont acceptées. Les minimum/maximum des
+    valeurs acceptées sont suivis en continu. Contrairement à remove_outliers(), qui
+    voit toute la série, le résultat dépend de l'ordre d'arrivée.
+    """
+    
+    def __init__(self, threshold=3.0, warmup=30, column=None):
+        super().__init__(column)
+        self.threshold = threshold
+        self.warmup = warmup
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+    
+    @property
+    def std(self):
+        return float(np.sqrt(self._m2 / (self.count - 1))) if self.count > 1 else np.nan
+    
+    def mask(self, batch):
+        values = self._values(batch)
+        mask = np.zeros(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            if value != value:
+                continue
+            
+            std = self.std
+            accepted = (self.count < self.warmup or std == 0
+                        or abs(value - self.mean) / std <= self.threshold)
+            if accepted:
+                mask[i] = True
+                self.min = min(self.min, value)
+                self.max = max(self.max, value)
+            
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self._m2 += delta * (value - self.mean)
+        return mask
+
+
 def test_data_processing():
     
     print("=" * 60)
@@ -270,18 +1213,122 @@ def test_data_processing():
     print("\n6. Outlier Removal (IQR Method)..")
     no_outliers = processor.remove_outliers('co_gt', method='iqr', threshold=1.5)
     
+    print("\n6b. Chunked Outlier Removal (KLL Sketch) vs In-Memory..")
+    chunked_kept = sum(len(chunk) for chunk in
+                       DataProcessor().remove_outliers_chunked('co_gt', source="AirQualityUCI.csv",
+                                                               chunksize=1000))
+    print(f" Remaining Records: {chunked_kept} Chunked vs {len(no_outliers)} In-Memory")
+    
+    print("\n7. Chunked (Out-of-Core) Cleaning..")
+    chunked = DataProcessor()
+    chunked.clean_data_chunked("AirQualityUCI.csv", chunksize=1000, store=False)
 
+    print("\n7b. Local Despiking of 'co_gt' (Hampel Filter)..")
+    despiked = processor.apply_hampel_filter('co_gt', window_size=25, n_sigmas=3.0)
+    
     print("\n8. Storing Cleaned Data in the Database..")
     processor.store_cleaned_data()
     
+    print("\n8b. Incremental Import Split Inside a Gap (CO)..")
+    with open("AirQualityUCI.csv", 'rb') as f:
+        csv_lines = f.readlines()
+    co_missing = [line.split(b';')[2] == b'-200' for line in csv_lines]
+    split = next(i for i in range(2, len(csv_lines)) if co_missing[i - 1] and co_missing[i])
+    split_dir = tempfile.mkdtemp()
+    split_path = os.path.join(split_dir, "incremental_split.csv")
+    incremental = DataProcessor()
+    try:
+        for mode, part in (('wb', csv_lines[:split]), ('ab', csv_lines[split:])):
+            with open(split_path, mode) as f:
+                f.writelines(part)
+            incremental.load_data_incremental(split_path)
+    finally:
+        with processor.db.session():
+            processor.db.reset_import_watermark(split_path)
+        shutil.rmtree(split_dir, ignore_errors=True)
+    
+    with processor.db.session():
+        stored = processor.db.get_data_as_dataframe(columns=['measured_at'] + VALUE_COLUMNS)
+    full = processor.cleaned_data.set_index(
+        parse_measured_at_series(processor.cleaned_data['date'], processor.cleaned_data['time']))
+    stored = stored.set_index(pd.to_datetime(stored['measured_at']))[VALUE_COLUMNS]
+    common = stored.index.intersection(full.index)
+    deviation = np.abs(stored.loc[common].to_numpy() - full.loc[common, VALUE_COLUMNS].to_numpy())
+    #colonnes FLOAT en base: écart attendu à la précision simple
+    print(f" Split at Line {split}: Max Deviation vs Full Cleaning {np.nanmax(deviation):.2e}")
+    
     print("\n9. Creating the Visualization..")
     processor.visualize_filtering_effect('temperature', window_size=10, 
                                          save_path='images/filtering_effect.png')
     
+    print("\n10. Streaming Filters (Live Feed Simulation)..")
+    live = StreamingMovingAverage(window_size=10)
+    samples = processor.cleaned_data['temperature'].to_numpy()
+    streamed = np.concatenate([live.update(samples[i:i + 24]) for i in range(0, len(samples), 24)]
+                              + [live.flush()])
+    print(f" Max Difference vs Batch: {np.abs(streamed - temp_filtered.to_numpy()).max():.2e}")
+    
     print("\n" + "=" * 60)
     print("All Tests Passed!")
     print("=" * 60)
 
 
+def benchmark_csv_loading(csv_path="AirQualityUCI.csv", copies=50, float_dtype='float32'):
+    #compare la lecture complète et la lecture projetée/typée sur un gros CSV
+    #(le fichier source concaténé `copies` fois dans un fichier temporaire)
+    import tempfile
+    import tracemalloc
+    
+    print("=" * 60)
+    print("CSV Loading Benchmark")
+    print("=" * 60)
+    
+    with open(csv_path, 'rb') as f:
+        header = f.readline()
+        body = f.read()
+    
+    with tempfile.NamedTemporaryFile(suffix='.csv', delete=False) as tmp:
+        tmp.write(header)
+        for _ in range(copies):
+            tmp.write(body)
+        big_path = tmp.name
+    
+    def full_load():
+        data = pd.read_csv(big_path, sep=';', decimal=',')
+        return data.dropna(axis=1, how='all').rename(columns=CSV_COLUMN_MAPPING)
+    
+    runs = [('full (default)', full_load),
+            (f'fast (c, {float_dtype})', lambda: read_csv_fast(big_path, float_dtype, engine='c'))]
+    if _fast_csv_engine() == 'pyarrow':
+        runs.append((f'fast (pyarrow, {float_dtype})',
+                     lambda: read_csv_fast(big_path, float_dtype, engine='pyarrow')))
+    
+    results = {}
+    try:
+        for label, load in runs:
+            #pic mesuré sur le tas Python/NumPy (les tampons internes d'Arrow n'y figurent pas)
+            tracemalloc.start()
+            start = time.perf_counter()
+            data = load()
+            elapsed = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            
+            results[label] = {'seconds': elapsed, 'peak_mb': peak / 2**20,
+                              'frame_mb': data.memory_usage(deep=True).sum() / 2**20,
+                              'rows': len(data)}
+            del data
+    finally:
+        os.remove(big_path)
+    
+    baseline = results['full (default)']['seconds']
+    print(f" {len(body.splitlines()) * copies} Lines ({copies} Copies of {csv_path})\n")
+    for label, r in results.items():
+        print(f" {label:<24} {r['seconds']:>7.2f} s (x{baseline / r['seconds']:.1f})  "
+              f"peak {r['peak_mb']:>7.1f} MB  frame {r['frame_mb']:>7.1f} MB")
+    
+    return results
+
+
 if __name__ == "__main__":
     test_data_processing()
@@ -8,6 +8,7 @@ Fonctionnalités:
 - Diagrammes de dispersion
 - Heatmaps de corrélation
 - Diagrammes d'analyse spectrale
+- Relecture des spectrogrammes sauvegardés (.npz)
 - Affichage des images traitées
 """
 
@@ -19,6 +20,7 @@ from matplotlib.gridspec import GridSpec
 import seaborn as sns
 from scipy.signal import welch
 from database_integration import AirQualityDatabase
+from spectral_analysis import SpectrogramEngine
 import os
 
 LABELS = {
@@ -42,12 +44,13 @@ class DataVisualizer:
     
     def load_data(self):
 
-        self.db.connect()
-        self.data = self.db.get_data_as_dataframe()
-        self.db.disconnect()
+        with self.db.session():
+            self.data = self.db.get_data_as_dataframe()
         
-        #créer une colonne datetime
-        if 'date' in self.data.columns and 'time' in self.data.columns:
+        #créer une colonne datetime (measured_at est déjà typée côté base)
+        if 'measured_at' in self.data.columns:
+            self.data['datetime'] = pd.to_datetime(self.data['measured_at'])
+        elif 'date' in self.data.columns and 'time' in self.data.columns:
             self.data['datetime'] = pd.to_datetime(
                 self.data['date'] + ' ' + self.data['time'].str.replace('.', ':'),
                 format='%d/%m/%Y %H:%M:%S',
@@ -318,6 +321,48 @@ class DataVisualizer:
         
         plt.show()
     
+    def plot_spectrogram(self, source, title=None, max_frequency=None, save_path=None):
+        #relit un spectrogramme (SpectrogramEngine ou fichier .npz) sans recalculer la TFCT
+        
+        engine = source if isinstance(source, SpectrogramEngine) else SpectrogramEngine.load(source)
+        if engine.n_frames == 0:
+            raise ValueError("Spectrogram Has No Frame.")
+        
+        frequencies = engine.frequencies
+        power = engine.power
+        if max_frequency is not None:
+            keep = frequencies <= max_frequency
+            frequencies, power = frequencies[keep], power[keep]
+        
+        #axe temporel en dates si l'origine est connue, sinon en heures
+        times = engine.timestamps()
+        if times is None:
+            times = engine.times
+        
+        fig, ax = plt.subplots(figsize=(14, 6))
+        mesh = ax.pcolormesh(times, frequencies, 10 * np.log10(power + np.finfo(np.float32).tiny),
+                             shading='nearest', cmap='viridis')
+        fig.colorbar(mesh, ax=ax, label='Power Spectral Density (dB)')
+        
+        ax.axhline(y=1/24, color='red', linestyle='--', alpha=0.7, label='24h')
+        ax.axhline(y=1/168, color='white', linestyle='--', alpha=0.7, label='7 jours')
+        ax.set_title(title or f'Spectrogram (window={engine.window}, hop={engine.hop})',
+                     fontsize=12, fontweight='bold')
+        ax.set_xlabel('Date' if engine.origin is not None else 'Time (hours)')
+        ax.set_ylabel('Frequency (Hz)')
+        ax.legend(loc='upper right')
+        
+        if engine.origin is not None:
+            ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+        
+        plt.tight_layout()
+        
+        if save_path:
+            plt.savefig(save_path, dpi=150, bbox_inches='tight')
+            print(f"Figure saved: {save_path}")
+        
+        plt.show()
+    
     #IMAGES
     
     def display_processed_images(self, image_dir="images", save_path=None):
@@ -405,6 +450,12 @@ def test_data_visualization():
     print("\n7. Spectral Analysis Visualization..")
     viz.plot_spectral_analysis('temperature', save_path='images/viz_spectral.png')
     
+    print("\n7b. Spectrogram Replay..")
+    spectrogram_path = 'images/spectrogram_temperature.npz'
+    if os.path.exists(spectrogram_path):
+        viz.plot_spectrogram(spectrogram_path, title='Spectrogram: temperature',
+                             save_path='images/viz_spectrogram.png')
+    
     print("\n8. Displaying Processed Images..")
     viz.display_processed_images(save_path='images/viz_images.png')
     
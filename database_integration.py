@@ -13,9 +13,219 @@ Fonctionnalités:
 """
 
 import mysql.connector
+import numpy as np
 import pandas as pd
 import os
-from datetime import datetime
+import ast
+import time
+import threading
+import zlib
+from contextlib import contextmanager
+from itertools import islice
+from datetime import datetime, date as date_type, timedelta
+from result_cache import invalidate_results
+
+
+#colonnes insérées dans air_quality_measurements (ordre des VALUES)
+MEASUREMENT_COLUMNS = ['station', 'date', 'time', 'measured_at',
+                       'co_gt', 'no2_gt', 'temperature', 'humidity']
+
+#station attribuée aux mesures qui n'en précisent pas (CSV UCI mono-station)
+DEFAULT_STATION = 'default'
+
+#colonnes lisibles de air_quality_measurements (projection)
+SELECTABLE_COLUMNS = ['id'] + MEASUREMENT_COLUMNS + ['created_at']
+
+#colonnes numériques filtrables par seuil
+VALUE_COLUMNS = ['co_gt', 'no2_gt', 'temperature', 'humidity']
+
+#colonnes résumées par get_statistics (ordre d'affichage)
+STAT_COLUMNS = ['co_gt', 'temperature', 'humidity', 'no2_gt']
+
+#index secondaires de air_quality_measurements: nom -> colonnes
+SECONDARY_INDEXES = {f'idx_{col}': (col,) for col in VALUE_COLUMNS}
+SECONDARY_INDEXES.update({f'idx_measured_at_{col}': ('measured_at', col) for col in VALUE_COLUMNS})
+
+#formats des colonnes texte date/time (dd/mm/yyyy et HH.MM.SS)
+DATETIME_FORMAT = '%d/%m/%Y %H.%M.%S'
+DATE_FORMAT = '%d/%m/%Y'
+MYSQL_DATETIME_FORMAT = '%d/%m/%Y %H.%i.%s'
+
+#correspondance entre les colonnes du CSV UCI et notre schéma
+CSV_COLUMN_MAPPING = {
+    'Date': 'date',
+    'Time': 'time',
+    'CO(GT)': 'co_gt',
+    'NO2(GT)': 'no2_gt',
+    'T': 'temperature',
+    'RH': 'humidity',
+}
+
+
+def parse_measured_at(date, time):
+    #convertit un couple (date, time) texte en datetime, None si invalide
+    try:
+        return datetime.strptime(f"{date} {time}", DATETIME_FORMAT)
+    except (TypeError, ValueError):
+        return None
+
+
+TIME_FORMAT = '%H.%M.%S'
+
+
+def parse_measured_at_series(dates, times):
+    #version vectorisée de parse_measured_at (NaT si invalide)
+    #dates et heures se répètent beaucoup: seules les valeurs distinctes sont parsées
+    date_codes, date_values = pd.factorize(dates)
+    time_codes, time_values = pd.factorize(times)
+    
+    days = pd.to_datetime(pd.Index(date_values).astype(str), format=DATE_FORMAT, errors='coerce')
+    clock = pd.to_datetime(pd.Index(time_values).astype(str), format=TIME_FORMAT, errors='coerce')
+    
+    #code -1 (valeur manquante) -> dernier élément ajouté, NaT
+    days = np.append(days.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT'))
+    offsets = np.append((clock - clock.normalize()).to_numpy(), np.timedelta64('NaT'))
+    return pd.Series(days[date_codes] + offsets[time_codes], index=dates.index)
+
+
+def pack_array(values, dtype='<f4', delta=False):
+    """Sérialise un tableau 1D en octets little-endian compressés (zlib).
+
+    delta=True stocke les différences successives (ids quasi contigus -> très compressibles).
+    """
+    values = np.asarray(values)
+    if delta:
+        values = np.diff(values, prepend=0)
+    return zlib.compress(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+
+def unpack_array(blob, dtype='<f4', delta=False):
+    #inverse de pack_array; sans delta le tableau est une vue sur le buffer décompressé
+    values = np.frombuffer(zlib.decompress(blob), dtype=dtype)
+    if delta:
+        values = np.cumsum(values, dtype=np.int64)
+    return values
+
+
+def dataframe_to_rows(df, columns=MEASUREMENT_COLUMNS):
+    """Convertit un DataFrame en liste de tuples SQL (NaN -> NULL) en une seule passe."""
+    subset = df.reindex(columns=columns)
+    
+    if 'station' in columns and 'station' not in df.columns:
+        subset['station'] = DEFAULT_STATION
+    
+    #measured_at est calculé à partir de date/time s'il n'est pas déjà présent
+    if 'measured_at' in columns:
+        measured_at = subset['measured_at']
+        if 'measured_at' not in df.columns and 'date' in df.columns and 'time' in df.columns:
+            measured_at = parse_measured_at_series(df['date'], df['time'])
+        subset['measured_at'] = pd.to_datetime(measured_at).dt.strftime('%Y-%m-%d %H:%M:%S')
+    
+    subset = subset.astype(object).where(subset.notna(), None)
+    return list(subset.itertuples(index=False, name=None))
+
+
+def _to_datetime(value):
+    #accepte un datetime, une date ou une chaîne 'dd/mm/yyyy' [HH.MM.SS]
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date_type):
+        return datetime(value.year, value.month, value.day)
+    value = str(value).strip()
+    fmt = DATETIME_FORMAT if ' ' in value else DATE_FORMAT
+    return datetime.strptime(value, fmt)
+
+
+class ConnectionPool:
+    #pool de connexions MySQL réutilisables (thread-safe)
+    
+    def __init__(self, host, user, password, database, pool_size=5):
+        self.config = {
+            'host': host,
+            'user': user,
+            'password': password,
+            'database': database,
+        }
+        self.pool_size = pool_size
+        self.hits = 0
+        self.misses = 0
+        self._idle = []
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Retourne une connexion inactive du pool, ou en ouvre une nouvelle."""
+        with self._lock:
+            while self._idle:
+                conn = self._idle.pop()
+                #une connexion expirée côté serveur est simplement abandonnée
+                if conn.is_connected():
+                    self.hits += 1
+                    return conn
+            self.misses += 1
+        return mysql.connector.connect(**self.config)
+    
+    def release(self, conn):
+        """Remet la connexion dans le pool (transaction en cours annulée)."""
+        try:
+            conn.consume_results()
+            conn.rollback()
+        except mysql.connector.Error:
+            conn.close()
+            return
+        
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+    
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'idle': len(self._idle),
+                'pool_size': self.pool_size,
+            }
+
+
+#pools partagés par tout le processus, un par (hôte, utilisateur, base)
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def get_connection_pool(host, user, password, database, pool_size=5):
+    """Retourne le pool du processus pour cette base, en le créant au premier appel.
+
+    La base est créée (CREATE DATABASE IF NOT EXISTS) une seule fois par processus,
+    à la création du pool.
+    """
+    key = (host, user, database)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            temp_conn = mysql.connector.connect(host=host, user=user, password=password)
+            temp_cursor = temp_conn.cursor()
+            temp_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {database}")
+            temp_conn.close()
+            
+            pool = ConnectionPool(host, user, password, database, pool_size=pool_size)
+            _POOLS[key] = pool
+    return pool
+
+
+def connection_pool_stats():
+    #compteurs hit/miss de tous les pools du processus
+    with _POOLS_LOCK:
+        return {f"{host}/{database}": pool.stats() for (host, _, database), pool in _POOLS.items()}
 
 
 class AirQualityDatabase:
@@ -30,25 +240,11 @@ class AirQualityDatabase:
         self.cursor = None
     
     def connect(self):
-        #Établit la connexion à la base de données MySQL
+        #Établit la connexion à la base de données MySQL (emprunte une connexion au pool)
+        if self.connection is not None:
+            return
         try:
-            # First connect without database to create it if needed
-            temp_conn = mysql.connector.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password
-            )
-            temp_cursor = temp_conn.cursor()
-            temp_cursor.execute(f"CREATE DATABASE IF NOT EXISTS {self.db_name}")
-            temp_conn.close()
-            
-            # Now connect to the specific database
-            self.connection = mysql.connector.connect(
-                host=self.host,
-                user=self.user,
-                password=self.password,
-                database=self.db_name
-            )
+            self.connection = self._get_pool().acquire()
             self.cursor = self.connection.cursor()
             print(f"Database Connection Established: {self.db_name}")
         except mysql.connector.Error as err:
@@ -56,27 +252,70 @@ class AirQualityDatabase:
             raise
     
     def disconnect(self):
-        #ferme la connexion à la base de données
+        #rend la connexion au pool
         if self.connection:
-            self.connection.close()
+            if self.cursor is not None:
+                self.cursor.close()
+            self._get_pool().release(self.connection)
+            self.connection = None
+            self.cursor = None
             print("Connection Closed.")
     
-    def create_tables(self):
+    def _get_pool(self):
+        return get_connection_pool(self.host, self.user, self.password, self.db_name)
+    
+    @contextmanager
+    def session(self):
+        """Context manager: connexion empruntée au pool, commit en sortie, rollback sur erreur.
+
+        Les sessions imbriquées réutilisent la connexion de la session englobante.
+        """
+        owner = self.connection is None
+        if owner:
+            self.connect()
+        try:
+            yield self
+            if owner:
+                self.connection.commit()
+        except Exception:
+            if owner and self.connection is not None:
+                self.connection.rollback()
+            raise
+        finally:
+            if owner:
+                self.disconnect()
+    
+    def pool_stats(self):
+        #compteurs hit/miss du pool utilisé par cette instance
+        return self._get_pool().stats()
+    
+    def create_tables(self, secondary_indexes=True):
         
         #table principale pour les mesures de qualité de l'air
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS air_quality_measurements (
                 id INT AUTO_INCREMENT PRIMARY KEY,
+                station VARCHAR(50) NOT NULL DEFAULT 'default',
                 date VARCHAR(20) NOT NULL,
                 time VARCHAR(20) NOT NULL,
+                measured_at DATETIME NULL,
                 co_gt FLOAT,
                 no2_gt FLOAT,
                 temperature FLOAT,
                 humidity FLOAT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_measured_at (measured_at),
+                UNIQUE KEY uq_station_measured_at (station, measured_at)
             )
         ''')
         
+        #bases créées avant l'ajout de measured_at / station
+        self.migrate_measured_at()
+        self.migrate_station_key()
+        
+        if secondary_indexes:
+            self.create_indexes()
+        
         #table pour les métadonnées des images
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS image_metadata (
@@ -123,10 +362,22 @@ class AirQualityDatabase:
                 variable_name VARCHAR(100) NOT NULL,
                 dominant_frequency FLOAT,
                 power_spectrum_data TEXT,
+                spectrum_method VARCHAR(20),
+                n_points INT,
+                sampling_rate DOUBLE,
+                spectrum_blob LONGBLOB,
                 analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
             )
         ''')
         
+        #spectres binaires pleine résolution (tables créées avant leur ajout)
+        for column, definition in [('spectrum_method', 'VARCHAR(20)'), ('n_points', 'INT'),
+                                   ('sampling_rate', 'DOUBLE'), ('spectrum_blob', 'LONGBLOB')]:
+            if not self._column_exists('spectral_analysis', column):
+                self.cursor.execute(
+                    f"ALTER TABLE spectral_analysis ADD COLUMN {column} {definition} AFTER power_spectrum_data"
+                )
+        
         # Table pour stocker l'historique des données filtrées
         self.cursor.execute('''
             CREATE TABLE IF NOT EXISTS filtered_data_history (
@@ -141,14 +392,152 @@ class AirQualityDatabase:
                 filtered_value FLOAT,
                 row_index INT,
                 applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (original_record_id) REFERENCES air_quality_measurements(id) ON DELETE CASCADE
+                CONSTRAINT fk_history_measurement FOREIGN KEY (original_record_id)
+                    REFERENCES air_quality_measurements(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Historique compact: un en-tête par exécution de filtre...
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS filter_runs (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                variable_name VARCHAR(100) NOT NULL,
+                filter_type VARCHAR(100) NOT NULL,
+                window_size INT,
+                threshold_min FLOAT,
+                threshold_max FLOAT,
+                n_sigmas FLOAT,
+                n_samples INT NOT NULL,
+                first_record_id INT,
+                last_record_id INT,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                INDEX idx_runs_lookup (variable_name, filter_type, applied_at)
+            )
+        ''')
+        
+        #seuil du filtre de Hampel (tables créées avant son ajout)
+        if not self._column_exists('filter_runs', 'n_sigmas'):
+            self.cursor.execute("ALTER TABLE filter_runs ADD COLUMN n_sigmas FLOAT AFTER threshold_max")
+        
+        # ...et les valeurs de l'exécution en tableaux binaires compressés
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS filter_run_payloads (
+                run_id INT PRIMARY KEY,
+                record_ids LONGBLOB NOT NULL,
+                row_indices LONGBLOB NOT NULL,
+                original_values LONGBLOB NOT NULL,
+                filtered_values LONGBLOB NOT NULL,
+                FOREIGN KEY (run_id) REFERENCES filter_runs(id) ON DELETE CASCADE
+            )
+        ''')
+        
+        # Repères d'import incrémental des CSV (un par fichier)
+        self.cursor.execute('''
+            CREATE TABLE IF NOT EXISTS import_watermarks (
+                file_path VARCHAR(500) PRIMARY KEY,
+                byte_offset BIGINT NOT NULL,
+                last_measured_at DATETIME NULL,
+                context_lines MEDIUMTEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
             )
         ''')
         
         self.connection.commit()
         print("Tables Created Successfully.")
     
-    def load_csv_to_database(self, csv_path):
+    def _column_exists(self, table, column):
+        self.cursor.execute('''
+            SELECT COUNT(*) FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND COLUMN_NAME = %s
+        ''', (self.db_name, table, column))
+        return self.cursor.fetchone()[0] > 0
+    
+    def _index_exists(self, table, index_name):
+        self.cursor.execute('''
+            SELECT COUNT(*) FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s AND INDEX_NAME = %s
+        ''', (self.db_name, table, index_name))
+        return self.cursor.fetchone()[0] > 0
+    
+    def migrate_measured_at(self):
+        """Ajoute la colonne measured_at (DATETIME indexée) et la remplit à partir de date/time."""
+        if not self._column_exists('air_quality_measurements', 'measured_at'):
+            self.cursor.execute('''
+                ALTER TABLE air_quality_measurements
+                ADD COLUMN measured_at DATETIME NULL AFTER time
+            ''')
+            
+            #IGNORE: les dates invalides donnent NULL au lieu d'une erreur en mode strict
+            self.cursor.execute('''
+                UPDATE IGNORE air_quality_measurements
+                SET measured_at = STR_TO_DATE(CONCAT(date, ' ', time), %s)
+                WHERE measured_at IS NULL
+            ''', (MYSQL_DATETIME_FORMAT,))
+            print(f"measured_at Migration: {self.cursor.rowcount} Rows Updated")
+        
+        if not self._index_exists('air_quality_measurements', 'idx_measured_at'):
+            self.cursor.execute(
+                "CREATE INDEX idx_measured_at ON air_quality_measurements (measured_at)"
+            )
+        
+        self.connection.commit()
+    
+    def migrate_station_key(self):
+        """Ajoute la colonne station et la clé unique (station, measured_at)."""
+        if not self._column_exists('air_quality_measurements', 'station'):
+            self.cursor.execute('''
+                ALTER TABLE air_quality_measurements
+                ADD COLUMN station VARCHAR(50) NOT NULL DEFAULT 'default' AFTER id
+            ''')
+        
+        if not self._index_exists('air_quality_measurements', 'uq_station_measured_at'):
+            #doublons existants: on garde la première insertion
+            self.cursor.execute('''
+                DELETE newer FROM air_quality_measurements newer
+                JOIN air_quality_measurements older
+                  ON newer.station = older.station
+                 AND newer.measured_at = older.measured_at
+                 AND newer.id > older.id
+            ''')
+            if self.cursor.rowcount:
+                print(f"{self.cursor.rowcount} Duplicate Measurements Removed.")
+            self.cursor.execute('''
+                ALTER TABLE air_quality_measurements
+                ADD UNIQUE KEY uq_station_measured_at (station, measured_at)
+            ''')
+        
+        self.connection.commit()
+    
+    def create_indexes(self):
+        """Crée les index secondaires (colonnes polluants et composites (measured_at, colonne))."""
+        created = 0
+        for name, columns in SECONDARY_INDEXES.items():
+            if not self._index_exists('air_quality_measurements', name):
+                self.cursor.execute(
+                    f"CREATE INDEX {name} ON air_quality_measurements ({', '.join(columns)})"
+                )
+                created += 1
+        self.connection.commit()
+        if created:
+            print(f"{created} Secondary Indexes Created.")
+        return created
+    
+    def drop_indexes(self):
+        #supprime les index secondaires (ex: avant un très gros chargement)
+        dropped = 0
+        for name in SECONDARY_INDEXES:
+            if self._index_exists('air_quality_measurements', name):
+                self.cursor.execute(f"DROP INDEX {name} ON air_quality_measurements")
+                dropped += 1
+        self.connection.commit()
+        print(f"{dropped} Secondary Indexes Dropped.")
+        return dropped
+    
+    def load_csv_to_database(self, csv_path, mode='upsert', batch_size=5000):
+        #mode: 'upsert' (réimport idempotent sur (station, measured_at)),
+        #'bulk' (INSERT par lots) ou 'row' (ligne par ligne), sans contrôle des doublons
+        if mode not in ('upsert', 'bulk', 'row'):
+            raise ValueError(f"Invalid Mode '{mode}'. Valid Modes: 'upsert', 'bulk', 'row'")
         
         #lecture du CSV avec le bon séparateur et format décimal
         df = pd.read_csv(csv_path, sep=';', decimal=',')
@@ -157,56 +546,272 @@ class AirQualityDatabase:
         df = df.dropna(axis=1, how='all')
         
         #renommer colonnes pour correspondre à notre schéma
-        column_mapping = {
-            'Date': 'date',
-            'Time': 'time',
-            'CO(GT)': 'co_gt',
-            'NO2(GT)': 'no2_gt',
-            'T': 'temperature',
-            'RH': 'humidity',
-        }
-        df = df.rename(columns=column_mapping)
+        df = df.rename(columns=CSV_COLUMN_MAPPING)
         
         df = df.replace(-200, None)
         
         df = df.dropna(how='all')
         
-        #insertion des données
+        start = time.perf_counter()
+        
+        if mode == 'upsert':
+            #seules les lignes nouvelles ou modifiées sont écrites
+            count = self.upsert_measurements(df, batch_size=batch_size)['written']
+        elif mode == 'bulk':
+            #insertion par lots (INSERT multi-lignes)
+            count = self.insert_measurements_bulk(dataframe_to_rows(df), batch_size=batch_size)
+        else:
+            #insertion ligne par ligne (ancien chemin, gardé pour comparaison)
+            count = 0
+            for _, row in df.iterrows():
+                try:
+                    self.cursor.execute('''
+                        INSERT INTO air_quality_measurements 
+                        (date, time, measured_at, co_gt, no2_gt, temperature, humidity)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s)
+                    ''', (
+                        row.get('date'), row.get('time'),
+                        parse_measured_at(row.get('date'), row.get('time')),
+                        None if pd.isna(row.get('co_gt')) else row.get('co_gt'),
+                        None if pd.isna(row.get('no2_gt')) else row.get('no2_gt'),
+                        None if pd.isna(row.get('temperature')) else row.get('temperature'),
+                        None if pd.isna(row.get('humidity')) else row.get('humidity')
+                    ))
+                    count += 1
+                except Exception as e:
+                    print(f"Error During Insertion: {e}")
+            
+            self.connection.commit()
+        
+        elapsed = time.perf_counter() - start
+        rate = count / elapsed if elapsed > 0 else float('inf')
+        print(f"{count} Records Inserted Since {csv_path} "
+              f"({elapsed:.2f}s, {rate:.0f} rows/s, {mode})")
+        return count
+    
+    def insert_measurements_bulk(self, rows, batch_size=5000, table='air_quality_measurements',
+                                 commit=True):
+        """Insère des tuples (MEASUREMENT_COLUMNS) par lots dans une seule transaction.
+
+        rows peut être une liste ou n'importe quel itérable (générateur de lignes
+        produit au fil de l'eau): seuls batch_size tuples sont en mémoire à la fois.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+        
+        query = f'''
+            INSERT INTO {table} 
+            ({', '.join(MEASUREMENT_COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(MEASUREMENT_COLUMNS))})
+        '''
+        
         count = 0
-        for _, row in df.iterrows():
+        try:
+            #executemany réécrit l'INSERT en une seule requête multi-lignes par lot
+            rows = iter(rows)
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                self.cursor.executemany(query, batch)
+                count += len(batch)
+            if commit:
+                self.connection.commit()
+        except mysql.connector.Error as err:
+            self.connection.rollback()
+            print(f"Error During Bulk Insertion: {err}")
+            raise
+        
+        #les résultats mémorisés reposent sur les anciennes données
+        invalidate_results()
+        return count
+    
+    def upsert_measurements(self, df, station=DEFAULT_STATION, batch_size=5000):
+        """Écrit uniquement les mesures nouvelles ou modifiées, clé (station, measured_at).
+
+        Les lignes existantes de la plage temporelle couverte par df sont lues via la clé
+        unique, comparées (à la précision FLOAT de la colonne), puis seules les lignes
+        nouvelles ou différentes sont envoyées en INSERT ... ON DUPLICATE KEY UPDATE.
+        """
+        frame = pd.DataFrame({
+            'date': df['date'].astype(str),
+            'time': df['time'].astype(str),
+        }, index=df.index)
+        frame['station'] = df['station'] if 'station' in df.columns else station
+        frame['measured_at'] = (pd.to_datetime(df['measured_at']) if 'measured_at' in df.columns
+                                else parse_measured_at_series(df['date'], df['time']))
+        for col in VALUE_COLUMNS:
+            frame[col] = pd.to_numeric(df[col], errors='coerce') if col in df.columns else np.nan
+        
+        #sans horodatage valide la clé unique ne peut pas s'appliquer
+        skipped = int(frame['measured_at'].isna().sum())
+        frame = frame[frame['measured_at'].notna()]
+        frame['measured_at'] = frame['measured_at'].astype('datetime64[ns]')
+        
+        stats = {'inserted': 0, 'updated': 0, 'unchanged': 0, 'skipped': skipped, 'written': 0}
+        if frame.empty:
+            return stats
+        
+        delta = []
+        for station_name, group in frame.groupby('station', sort=False):
+            #lecture par plage sur la clé (station, measured_at)
+            existing = pd.read_sql_query(f'''
+                SELECT measured_at, date AS date_db, time AS time_db,
+                       {', '.join(f'{col} AS {col}_db' for col in VALUE_COLUMNS)}
+                FROM air_quality_measurements
+                WHERE station = %s AND measured_at >= %s AND measured_at <= %s
+            ''', self.connection, params=[station_name,
+                                          group['measured_at'].min().to_pydatetime(),
+                                          group['measured_at'].max().to_pydatetime()])
+            existing['measured_at'] = pd.to_datetime(existing['measured_at']).astype('datetime64[ns]')
+            
+            merged = group.merge(existing, on='measured_at', how='left', indicator=True)
+            is_new = (merged['_merge'] == 'left_only').to_numpy()
+            
+            changed = np.zeros(len(merged), dtype=bool)
+            for col in VALUE_COLUMNS:
+                #les colonnes sont en FLOAT: comparaison en simple précision
+                new_values = merged[col].to_numpy(dtype=np.float32)
+                old_values = merged[f'{col}_db'].to_numpy(dtype=np.float32)
+                same = (new_values == old_values) | (np.isnan(new_values) & np.isnan(old_values))
+                changed |= ~same
+            for col in ('date', 'time'):
+                changed |= (merged[col] != merged[f'{col}_db']).to_numpy()
+            changed &= ~is_new
+            
+            stats['inserted'] += int(is_new.sum())
+            stats['updated'] += int(changed.sum())
+            stats['unchanged'] += int(len(merged) - is_new.sum() - changed.sum())
+            delta.append(merged.loc[is_new | changed, MEASUREMENT_COLUMNS])
+        
+        rows = dataframe_to_rows(pd.concat(delta)) if delta else []
+        updates = ', '.join(f"{col} = VALUES({col})"
+                            for col in MEASUREMENT_COLUMNS if col not in ('station', 'measured_at'))
+        query = f'''
+            INSERT INTO air_quality_measurements 
+            ({', '.join(MEASUREMENT_COLUMNS)})
+            VALUES ({', '.join(['%s'] * len(MEASUREMENT_COLUMNS))})
+            ON DUPLICATE KEY UPDATE {updates}
+        '''
+        try:
+            for start in range(0, len(rows), batch_size):
+                self.cursor.executemany(query, rows[start:start + batch_size])
+            self.connection.commit()
+        except mysql.connector.Error as err:
+            self.connection.rollback()
+            print(f"Error During Upsert: {err}")
+            raise
+        
+        if rows:
+            invalidate_results()
+        stats['written'] = len(rows)
+        print(f"Upsert: {stats['inserted']} inserted, {stats['updated']} updated, "
+              f"{stats['unchanged']} unchanged, {stats['skipped']} skipped")
+        return stats
+    
+    def replace_measurements(self, rows, batch_size=5000, swap=False):
+        """Remplace tout le contenu de air_quality_measurements par les lignes fournies.
+
+        Sans swap: DELETE + insertion par lots dans une même transaction.
+        Avec swap: chargement dans une table de staging puis RENAME TABLE atomique,
+        les lecteurs ne voient donc jamais une table vide pendant le rechargement.
+        """
+        #les exécutions de filtre référencent les anciens id
+        self.clear_filter_runs()
+        
+        if not swap:
             try:
-                self.cursor.execute('''
-                    INSERT INTO air_quality_measurements 
-                    (date, time, co_gt, no2_gt, temperature, humidity)
-                    VALUES (%s, %s, %s, %s, %s, %s)
-                ''', (
-                    row.get('date'), row.get('time'), 
-                    None if pd.isna(row.get('co_gt')) else row.get('co_gt'),
-                    None if pd.isna(row.get('no2_gt')) else row.get('no2_gt'),
-                    None if pd.isna(row.get('temperature')) else row.get('temperature'),
-                    None if pd.isna(row.get('humidity')) else row.get('humidity')
-                ))
-                count += 1
-            except Exception as e:
-                print(f"Error During Insertion: {e}")
+                self.cursor.execute("DELETE FROM air_quality_measurements")
+                count = self.insert_measurements_bulk(rows, batch_size=batch_size, commit=False)
+                self.connection.commit()
+            except mysql.connector.Error:
+                self.connection.rollback()
+                raise
+            return count
         
-        self.connection.commit()
-        print(f"{count} Records Inserted Since {csv_path}")
+        staging = 'air_quality_measurements_staging'
+        self.cursor.execute(f"DROP TABLE IF EXISTS {staging}")
+        self.cursor.execute(f"CREATE TABLE {staging} LIKE air_quality_measurements")
+        count = self.insert_measurements_bulk(rows, batch_size=batch_size, table=staging)
+        self._swap_measurements_table(staging)
+        invalidate_results()
         return count
     
+    def _foreign_keys(self, table):
+        #noms des clés étrangères d'une table
+        self.cursor.execute('''
+            SELECT CONSTRAINT_NAME FROM information_schema.TABLE_CONSTRAINTS
+            WHERE CONSTRAINT_SCHEMA = %s AND TABLE_NAME = %s AND CONSTRAINT_TYPE = 'FOREIGN KEY'
+        ''', (self.db_name, table))
+        return [row[0] for row in self.cursor.fetchall()]
+    
+    def _swap_measurements_table(self, staging):
+        #l'historique pointe vers les anciens id: même effet que le ON DELETE CASCADE
+        self.cursor.execute("DELETE FROM filtered_data_history")
+        self.connection.commit()
+        
+        #la clé étrangère suivrait l'ancienne table lors du RENAME, on la recrée ensuite
+        for name in self._foreign_keys('filtered_data_history'):
+            self.cursor.execute(f"ALTER TABLE filtered_data_history DROP FOREIGN KEY {name}")
+        
+        #les deux renommages sont faits en une seule opération atomique
+        self.cursor.execute(f'''
+            RENAME TABLE air_quality_measurements TO air_quality_measurements_old,
+                         {staging} TO air_quality_measurements
+        ''')
+        self.cursor.execute("DROP TABLE air_quality_measurements_old")
+        
+        self.cursor.execute('''
+            ALTER TABLE filtered_data_history
+            ADD CONSTRAINT fk_history_measurement FOREIGN KEY (original_record_id)
+                REFERENCES air_quality_measurements(id) ON DELETE CASCADE
+        ''')
+        
+        #les triggers disparaissent avec l'ancienne table
+        if self.summary_table_enabled():
+            self._create_summary_triggers()
+            self.rebuild_summary_table()
+    
+    def get_import_watermark(self, file_path):
+        #repère du dernier import incrémental de ce fichier (None si jamais importé)
+        self.cursor.execute('''
+            SELECT byte_offset, last_measured_at, context_lines
+            FROM import_watermarks WHERE file_path = %s
+        ''', (file_path,))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        return {'byte_offset': row[0], 'last_measured_at': row[1], 'context_lines': row[2] or ''}
+    
+    def set_import_watermark(self, file_path, byte_offset, last_measured_at, context_lines):
+        self.cursor.execute('''
+            INSERT INTO import_watermarks (file_path, byte_offset, last_measured_at, context_lines)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE byte_offset = VALUES(byte_offset),
+                                    last_measured_at = VALUES(last_measured_at),
+                                    context_lines = VALUES(context_lines)
+        ''', (file_path, int(byte_offset), last_measured_at, context_lines))
+        self.connection.commit()
+    
+    def reset_import_watermark(self, file_path):
+        #le prochain import incrémental relira tout le fichier
+        self.cursor.execute("DELETE FROM import_watermarks WHERE file_path = %s", (file_path,))
+        self.connection.commit()
+    
     # REQUÊTES CRUD
     
     def insert_measurement(self, date, time, co_gt=None, no2_gt=None,
-                           temperature=None, humidity=None):
+                           temperature=None, humidity=None, station=DEFAULT_STATION):
     
         self.cursor.execute('''
             INSERT INTO air_quality_measurements 
-            (date, time, co_gt, no2_gt, 
+            (station, date, time, measured_at, co_gt, no2_gt, 
              temperature, humidity)
-            VALUES (%s, %s, %s, %s, %s, %s)
-        ''', (date, time, co_gt, no2_gt,
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        ''', (station, date, time, parse_measured_at(date, time), co_gt, no2_gt,
               temperature, humidity))
         self.connection.commit()
+        invalidate_results()
         print(f"Measurement Inserted with ID: {self.cursor.lastrowid}")
         return self.cursor.lastrowid
     
@@ -220,51 +825,107 @@ class AirQualityDatabase:
         return self.cursor.fetchall()
     
     def get_measurements_by_date(self, start_date, end_date=None):
-
-        if end_date:
-            self.cursor.execute('''
-                SELECT * FROM air_quality_measurements 
-                WHERE date >= %s AND date <= %s
-            ''', (start_date, end_date))
-        else:
-            self.cursor.execute('''
-                SELECT * FROM air_quality_measurements 
-                WHERE date = %s
-            ''', (start_date,))
+        #dates 'dd/mm/yyyy' (ou date/datetime), bornes incluses
+        start = _to_datetime(start_date)
+        end = _to_datetime(end_date) if end_date else start
+        return self.get_measurements_by_time_range(start, end + timedelta(days=1))
+    
+    def get_measurements_by_time_range(self, start, end):
+        """Mesures avec start <= measured_at < end (lecture par plage sur idx_measured_at)."""
+        self.cursor.execute('''
+            SELECT * FROM air_quality_measurements 
+            WHERE measured_at >= %s AND measured_at < %s
+            ORDER BY measured_at
+        ''', (_to_datetime(start), _to_datetime(end)))
         return self.cursor.fetchall()
     
     def get_measurements_by_threshold(self, column, min_value=None, max_value=None):
   
-        valid_columns = ['co_gt', 'no2_gt',
-                        'temperature', 'humidity']
+        if column not in VALUE_COLUMNS:
+            raise ValueError(f"Invalid Column. Valid Columns: {VALUE_COLUMNS}")
         
-        if column not in valid_columns:
-            raise ValueError(f"Invalid Column. Valid Columns: {valid_columns}")
+        return self.query_measurements(column, min_value=min_value, max_value=max_value)
+    
+    def _build_measurement_query(self, column=None, min_value=None, max_value=None,
+                                 start=None, end=None, limit=None, select='*', order_by=None):
+        #construit une requête unique (plage temporelle + seuils) exploitable par les index
+        if column is not None and column not in VALUE_COLUMNS:
+            raise ValueError(f"Invalid Column. Valid Columns: {VALUE_COLUMNS}")
         
-        if min_value is not None and max_value is not None:
-            self.cursor.execute(f'''
-                SELECT * FROM air_quality_measurements 
-                WHERE {column} >= %s AND {column} <= %s
-            ''', (min_value, max_value))
-        elif min_value is not None:
-            self.cursor.execute(f'''
-                SELECT * FROM air_quality_measurements 
-                WHERE {column} >= %s
-            ''', (min_value,))
-        elif max_value is not None:
-            self.cursor.execute(f'''
-                SELECT * FROM air_quality_measurements 
-                WHERE {column} <= %s
-            ''', (max_value,))
+        conditions = []
+        params = []
+        
+        #la plage sur measured_at en premier: préfixe des index composites
+        if start is not None:
+            conditions.append("measured_at >= %s")
+            params.append(_to_datetime(start))
+        if end is not None:
+            conditions.append("measured_at < %s")
+            params.append(_to_datetime(end))
+        
+        if column is not None:
+            if min_value is not None:
+                conditions.append(f"{column} >= %s")
+                params.append(min_value)
+            if max_value is not None:
+                conditions.append(f"{column} <= %s")
+                params.append(max_value)
         
+        query = f"SELECT {select} FROM air_quality_measurements"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        if order_by:
+            query += f" ORDER BY {order_by}"
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        return query, params
+    
+    def query_measurements(self, column=None, min_value=None, max_value=None,
+                           start=None, end=None, limit=None):
+        """Mesures filtrées par seuils sur une colonne et/ou par plage [start, end) de measured_at."""
+        query, params = self._build_measurement_query(column, min_value, max_value,
+                                                      start, end, limit)
+        self.cursor.execute(query, params)
         return self.cursor.fetchall()
     
+    def explain_query(self, column=None, min_value=None, max_value=None,
+                      start=None, end=None):
+        """Diagnostic EXPLAIN de query_measurements: index choisi, type d'accès, lignes estimées."""
+        query, params = self._build_measurement_query(column, min_value, max_value, start, end)
+        self.cursor.execute("EXPLAIN " + query, params)
+        plan = dict(zip(self.cursor.column_names, self.cursor.fetchone()))
+        
+        #type ALL = parcours complet de la table
+        result = {
+            'key': plan.get('key'),
+            'possible_keys': plan.get('possible_keys'),
+            'access_type': plan.get('type'),
+            'rows': plan.get('rows'),
+            'uses_index': plan.get('key') is not None and plan.get('type') != 'ALL',
+        }
+        print(f"EXPLAIN: access={result['access_type']}, key={result['key']}, "
+              f"rows={result['rows']}, index used={result['uses_index']}")
+        return result
+    
     def update_measurement(self, record_id, **kwargs):
   
         if not kwargs:
             print("No Data to Update.")
             return False
         
+        #garder measured_at cohérent avec les colonnes texte date/time
+        if 'date' in kwargs or 'time' in kwargs:
+            date_val, time_val = kwargs.get('date'), kwargs.get('time')
+            if date_val is None or time_val is None:
+                self.cursor.execute(
+                    "SELECT date, time FROM air_quality_measurements WHERE id = %s", (record_id,)
+                )
+                current = self.cursor.fetchone()
+                if current:
+                    date_val = current[0] if date_val is None else date_val
+                    time_val = current[1] if time_val is None else time_val
+            kwargs['measured_at'] = parse_measured_at(date_val, time_val)
+        
         set_clause = ", ".join([f"{k} = %s" for k in kwargs.keys()])
         values = list(kwargs.values()) + [record_id]
         
@@ -274,6 +935,7 @@ class AirQualityDatabase:
             WHERE id = %s
         ''', values)
         self.connection.commit()
+        invalidate_results()
         print(f"Record {record_id} Updated.")
         return True
     
@@ -283,6 +945,7 @@ class AirQualityDatabase:
             DELETE FROM air_quality_measurements WHERE id = %s
         ''', (record_id,))
         self.connection.commit()
+        invalidate_results()
         print(f"Record {record_id} Deleted.")
         return True
     
@@ -304,8 +967,143 @@ class AirQualityDatabase:
             print(f"Error inserting filtered data: {err}")
             raise
     
+    def insert_filtered_data_batch(self, original_record_ids, variable_name, filter_type,
+                                   window_size, threshold_min, threshold_max,
+                                   original_values, filtered_values, row_indices,
+                                   batch_size=5000):
+        """Insère tout un résultat de filtrage (tableaux alignés) en une seule transaction."""
+        if not (len(original_record_ids) == len(original_values)
+                == len(filtered_values) == len(row_indices)):
+            raise ValueError("Record ids, values and row indices must have the same length.")
+        
+        #conversion vectorisée en types Python natifs, une seule fois
+        n = len(original_values)
+        rows = list(zip(
+            np.asarray(original_record_ids, dtype=np.int64).tolist(),
+            [variable_name] * n,
+            [filter_type] * n,
+            [window_size] * n,
+            [threshold_min] * n,
+            [threshold_max] * n,
+            np.asarray(original_values, dtype=np.float64).tolist(),
+            np.asarray(filtered_values, dtype=np.float64).tolist(),
+            np.asarray(row_indices, dtype=np.int64).tolist(),
+        ))
+        
+        query = '''
+            INSERT INTO filtered_data_history 
+            (original_record_id, variable_name, filter_type, window_size, 
+             threshold_min, threshold_max, original_value, filtered_value, row_index)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        '''
+        try:
+            #INSERT multi-lignes par lot, un seul commit à la fin
+            for start in range(0, len(rows), batch_size):
+                self.cursor.executemany(query, rows[start:start + batch_size])
+            self.connection.commit()
+        except mysql.connector.Error as err:
+            self.connection.rollback()
+            print(f"Error inserting filtered data: {err}")
+            raise
+        
+        return len(rows)
+    
+    def store_filter_run(self, original_record_ids, variable_name, filter_type,
+                         window_size, threshold_min, threshold_max,
+                         original_values, filtered_values, row_indices, n_sigmas=None):
+        """Enregistre une exécution de filtre: un en-tête + les valeurs en float32 compressés.
+
+        Remplace une ligne par échantillon dans filtered_data_history par une seule ligne
+        d'en-tête et un payload binaire; retourne l'id de l'exécution.
+        """
+        record_ids = np.asarray(original_record_ids, dtype=np.int64)
+        if not (len(record_ids) == len(original_values)
+                == len(filtered_values) == len(row_indices)):
+            raise ValueError("Record ids, values and row indices must have the same length.")
+        
+        try:
+            self.cursor.execute('''
+                INSERT INTO filter_runs 
+                (variable_name, filter_type, window_size, threshold_min, threshold_max,
+                 n_sigmas, n_samples, first_record_id, last_record_id)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            ''', (variable_name, filter_type, window_size, threshold_min, threshold_max,
+                  n_sigmas, len(record_ids),
+                  int(record_ids.min()) if len(record_ids) else None,
+                  int(record_ids.max()) if len(record_ids) else None))
+            run_id = self.cursor.lastrowid
+            
+            self.cursor.execute('''
+                INSERT INTO filter_run_payloads 
+                (run_id, record_ids, row_indices, original_values, filtered_values)
+                VALUES (%s, %s, %s, %s, %s)
+            ''', (run_id,
+                  pack_array(record_ids, dtype='<i4', delta=True),
+                  pack_array(row_indices, dtype='<i4', delta=True),
+                  pack_array(original_values),
+                  pack_array(filtered_values)))
+            self.connection.commit()
+        except mysql.connector.Error as err:
+            self.connection.rollback()
+            print(f"Error storing filter run: {err}")
+            raise
+        
+        return run_id
+    
+    def get_filter_runs(self, variable_name=None, filter_type=None, limit=None):
+        #en-têtes des exécutions (sans les payloads)
+        query = '''
+            SELECT id, variable_name, filter_type, window_size, threshold_min, threshold_max,
+                   n_sigmas, n_samples, first_record_id, last_record_id, applied_at
+            FROM filter_runs WHERE 1=1'''
+        params = []
+        
+        if variable_name:
+            query += " AND variable_name = %s"
+            params.append(variable_name)
+        
+        if filter_type:
+            query += " AND filter_type = %s"
+            params.append(filter_type)
+        
+        query += " ORDER BY applied_at DESC, id DESC"
+        
+        if limit:
+            query += f" LIMIT {int(limit)}"
+        
+        self.cursor.execute(query, params if params else None)
+        return self.cursor.fetchall()
+    
+    def load_filter_run(self, run_id):
+        """Décode le payload d'une exécution en tableaux NumPy."""
+        self.cursor.execute('''
+            SELECT record_ids, row_indices, original_values, filtered_values
+            FROM filter_run_payloads WHERE run_id = %s
+        ''', (run_id,))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        
+        return {
+            'record_ids': unpack_array(row[0], dtype='<i4', delta=True),
+            'row_indices': unpack_array(row[1], dtype='<i4', delta=True),
+            'original_values': unpack_array(row[2]),
+            'filtered_values': unpack_array(row[3]),
+        }
+    
+    def clear_filter_runs(self):
+        #les payloads suivent par ON DELETE CASCADE
+        self.cursor.execute("DELETE FROM filter_runs")
+    
     def get_filtered_data_history(self, variable_name=None, filter_type=None, limit=None):
-        """Récupère l'historique des données filtrées avec filtres optionnels."""
+        """Récupère l'historique des données filtrées avec filtres optionnels.
+
+        Les lignes ont la forme de filtered_data_history (id, original_record_id,
+        variable_name, filter_type, window_size, threshold_min, threshold_max,
+        original_value, filtered_value, row_index, applied_at) suivie de n_sigmas (None
+        hors Hampel); celles des exécutions compactes sont décodées à la demande, avec
+        l'id de l'exécution comme id.
+        """
         query = "SELECT * FROM filtered_data_history WHERE 1=1"
         params = []
         
@@ -323,36 +1121,280 @@ class AirQualityDatabase:
             query += f" LIMIT {limit}"
         
         self.cursor.execute(query, params if params else None)
-        return self.cursor.fetchall()
+        legacy_rows = self.cursor.fetchall()
+        
+        #décoder les exécutions les plus récentes jusqu'à atteindre la limite
+        run_rows = []
+        for run in self.get_filter_runs(variable_name, filter_type):
+            if limit and len(run_rows) >= limit:
+                break
+            run_id, var, ftype, window, tmin, tmax, sigmas, _, _, _, applied_at = run
+            payload = self.load_filter_run(run_id)
+            if payload is None:
+                continue
+            
+            n = len(payload['record_ids'])
+            if limit:
+                n = min(n, limit - len(run_rows))
+            run_rows.extend(zip(
+                [run_id] * n,
+                payload['record_ids'][:n].tolist(),
+                [var] * n, [ftype] * n, [window] * n, [tmin] * n, [tmax] * n,
+                payload['original_values'][:n].tolist(),
+                payload['filtered_values'][:n].tolist(),
+                payload['row_indices'][:n].tolist(),
+                [applied_at] * n,
+                [sigmas] * n,
+            ))
+        
+        legacy_rows = [tuple(row) + (None,) for row in legacy_rows]
+        rows = sorted(run_rows + legacy_rows, key=lambda row: row[10], reverse=True)
+        return rows[:limit] if limit else rows
+    
+    def store_spectrum(self, variable_name, dominant_frequency, power, n_points,
+                       sampling_rate, method):
+        """Stocke un spectre complet en float32 little-endian compressé.
+
+        La grille de fréquences n'est pas stockée: elle vaut rfftfreq(n_points, 1/sampling_rate).
+        """
+        #supprimer les anciens résultats pour cette variable
+        self.cursor.execute(
+            "DELETE FROM spectral_analysis WHERE variable_name = %s", (variable_name,)
+        )
+        self.cursor.execute('''
+            INSERT INTO spectral_analysis 
+            (variable_name, dominant_frequency, spectrum_method, n_points, sampling_rate, spectrum_blob)
+            VALUES (%s, %s, %s, %s, %s, %s)
+        ''', (variable_name, float(dominant_frequency), method, int(n_points),
+              float(sampling_rate), pack_array(power)))
+        self.connection.commit()
+    
+    def get_spectrum(self, variable_name):
+        """Relit le dernier spectre stocké: fréquences reconstruites et puissance (vue NumPy).
+
+        La puissance est une vue en lecture seule sur le buffer décompressé (aucune copie).
+        Les anciens résultats texte (100 premiers points) sont relus en repli.
+        """
+        self.cursor.execute('''
+            SELECT dominant_frequency, spectrum_method, n_points, sampling_rate,
+                   spectrum_blob, power_spectrum_data, analyzed_at
+            FROM spectral_analysis WHERE variable_name = %s
+            ORDER BY analyzed_at DESC, id DESC LIMIT 1
+        ''', (variable_name,))
+        row = self.cursor.fetchone()
+        if row is None:
+            return None
+        
+        dominant, method, n_points, sampling_rate, blob, legacy_text, analyzed_at = row
+        if blob is not None:
+            power = unpack_array(blob)
+            frequencies = np.fft.rfftfreq(n_points, d=1 / sampling_rate)
+        else:
+            legacy = ast.literal_eval(legacy_text)
+            frequencies = np.asarray(legacy['frequencies'])
+            power = np.asarray(legacy['power'])
+        
+        return {
+            'frequencies': frequencies,
+            'power': power,
+            'dominant_frequency': dominant,
+            'method': method,
+            'analyzed_at': analyzed_at,
+        }
     
     def get_statistics(self):
         stats = {}
         
-        #nombre total d'enregistrements
-        self.cursor.execute("SELECT COUNT(*) FROM air_quality_measurements")
-        stats['total_records'] = self.cursor.fetchone()[0]
+        #O(1): lecture de la table de synthèse si elle est maintenue
+        if self.summary_table_enabled():
+            return self._statistics_from_summary()
+        
+        #sinon un seul parcours de la table pour toutes les colonnes
+        aggregates = ", ".join(f"AVG({col}), MIN({col}), MAX({col})" for col in STAT_COLUMNS)
+        self.cursor.execute(f"SELECT COUNT(*), {aggregates} FROM air_quality_measurements")
+        result = self.cursor.fetchone()
+        
+        stats['total_records'] = result[0]
+        for i, col in enumerate(STAT_COLUMNS):
+            avg, min_val, max_val = result[1 + 3 * i:4 + 3 * i]
+            stats[col] = {
+                'moyenne': round(avg, 2) if avg is not None else None,
+                'min': min_val,
+                'max': max_val
+            }
         
-        columns = ['co_gt', 'temperature', 'humidity', 'no2_gt']
-        for col in columns:
+        return stats
+    
+    # TABLE DE SYNTHÈSE (statistiques maintenues par triggers)
+    
+    def summary_table_enabled(self):
+        self.cursor.execute('''
+            SELECT COUNT(*) FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'measurement_summary'
+        ''', (self.db_name,))
+        return self.cursor.fetchone()[0] > 0
+    
+    def enable_summary_table(self):
+        """Crée measurement_summary (count/sum/min/max par colonne) et ses triggers, puis la remplit.
+
+        Les triggers INSERT/UPDATE/DELETE maintiennent les compteurs de façon incrémentale.
+        Un min/max supprimé ou modifié marque la colonne 'stale': elle est recalculée
+        à la lecture suivante via MIN()/MAX(), qui utilisent les index secondaires.
+        """
+        column_defs = ",\n".join(
+            f"{col}_count BIGINT NOT NULL DEFAULT 0, {col}_sum DOUBLE NOT NULL DEFAULT 0, "
+            f"{col}_min DOUBLE NULL, {col}_max DOUBLE NULL, {col}_stale TINYINT NOT NULL DEFAULT 0"
+            for col in STAT_COLUMNS
+        )
+        self.cursor.execute(f'''
+            CREATE TABLE IF NOT EXISTS measurement_summary (
+                id TINYINT PRIMARY KEY,
+                total_records BIGINT NOT NULL DEFAULT 0,
+                {column_defs},
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP
+            )
+        ''')
+        self._create_summary_triggers()
+        self.rebuild_summary_table()
+        print("Summary Table Enabled.")
+    
+    def disable_summary_table(self):
+        self._drop_summary_triggers()
+        self.cursor.execute("DROP TABLE IF EXISTS measurement_summary")
+        self.connection.commit()
+        print("Summary Table Disabled.")
+    
+    def rebuild_summary_table(self):
+        #recalcule toute la synthèse en un seul parcours
+        aggregates = ", ".join(
+            f"COUNT({col}), COALESCE(SUM({col}), 0), MIN({col}), MAX({col}), 0"
+            for col in STAT_COLUMNS
+        )
+        columns = ", ".join(
+            f"{col}_count, {col}_sum, {col}_min, {col}_max, {col}_stale" for col in STAT_COLUMNS
+        )
+        self.cursor.execute(f'''
+            REPLACE INTO measurement_summary (id, total_records, {columns})
+            SELECT 1, COUNT(*), {aggregates} FROM air_quality_measurements
+        ''')
+        self.connection.commit()
+    
+    def _drop_summary_triggers(self):
+        for event in ('insert', 'update', 'delete'):
+            self.cursor.execute(f"DROP TRIGGER IF EXISTS trg_summary_{event}")
+    
+    def _create_summary_triggers(self):
+        self._drop_summary_triggers()
+        
+        def added(col):
+            #prise en compte de NEW.col (count, sum, min, max)
+            return (f"{col}_count = {col}_count + (NEW.{col} IS NOT NULL), "
+                    f"{col}_sum = {col}_sum + COALESCE(NEW.{col}, 0), "
+                    f"{col}_min = IF(NEW.{col} IS NULL, {col}_min, LEAST(COALESCE({col}_min, NEW.{col}), NEW.{col})), "
+                    f"{col}_max = IF(NEW.{col} IS NULL, {col}_max, GREATEST(COALESCE({col}_max, NEW.{col}), NEW.{col}))")
+        
+        def removed(col, changed=''):
+            #retrait de OLD.col; le stale est évalué avant la mise à jour de min/max
+            return (f"{col}_count = {col}_count - (OLD.{col} IS NOT NULL), "
+                    f"{col}_sum = {col}_sum - COALESCE(OLD.{col}, 0), "
+                    f"{col}_stale = {col}_stale OR (OLD.{col} IS NOT NULL{changed} "
+                    f"AND (OLD.{col} <= {col}_min OR OLD.{col} >= {col}_max))")
+        
+        bodies = {
+            'insert': ["total_records = total_records + 1"] + [added(col) for col in STAT_COLUMNS],
+            'delete': ["total_records = total_records - 1"] + [removed(col) for col in STAT_COLUMNS],
+            'update': [f"{removed(col, f' AND NOT (NEW.{col} <=> OLD.{col})')}, {added(col)}"
+                       for col in STAT_COLUMNS],
+        }
+        for event, assignments in bodies.items():
             self.cursor.execute(f'''
-                SELECT AVG({col}), MIN({col}), MAX({col}) 
-                FROM air_quality_measurements 
-                WHERE {col} IS NOT NULL
+                CREATE TRIGGER trg_summary_{event}
+                AFTER {event.upper()} ON air_quality_measurements
+                FOR EACH ROW
+                UPDATE measurement_summary SET {", ".join(assignments)} WHERE id = 1
             ''')
-            result = self.cursor.fetchone()
+        self.connection.commit()
+    
+    def _statistics_from_summary(self):
+        columns = ", ".join(
+            f"{col}_count, {col}_sum, {col}_min, {col}_max, {col}_stale" for col in STAT_COLUMNS
+        )
+        self.cursor.execute(f"SELECT total_records, {columns} FROM measurement_summary WHERE id = 1")
+        row = self.cursor.fetchone()
+        if row is None:
+            self.rebuild_summary_table()
+            return self._statistics_from_summary()
+        
+        stats = {'total_records': row[0]}
+        for i, col in enumerate(STAT_COLUMNS):
+            count, total, min_val, max_val, stale = row[1 + 5 * i:6 + 5 * i]
+            if stale:
+                #MIN/MAX sur colonne indexée: lecture directe de l'index
+                self.cursor.execute(f"SELECT MIN({col}), MAX({col}) FROM air_quality_measurements")
+                min_val, max_val = self.cursor.fetchone()
+                self.cursor.execute(
+                    f"UPDATE measurement_summary SET {col}_min = %s, {col}_max = %s, "
+                    f"{col}_stale = 0 WHERE id = 1", (min_val, max_val)
+                )
+                self.connection.commit()
             stats[col] = {
-                'moyenne': round(result[0], 2) if result[0] else None,
-                'min': result[1],
-                'max': result[2]
+                'moyenne': round(total / count, 2) if count else None,
+                'min': min_val,
+                'max': max_val
             }
         
         return stats
     
-    def get_data_as_dataframe(self):
+    def _projection(self, columns):
+        #liste SELECT validée (colonnes injectées dans la requête)
+        if columns is None:
+            return '*'
+        invalid = [col for col in columns if col not in SELECTABLE_COLUMNS]
+        if invalid:
+            raise ValueError(f"Invalid Columns {invalid}. Valid Columns: {SELECTABLE_COLUMNS}")
+        return ', '.join(columns)
+    
+    def get_data_as_dataframe(self, columns=None, start=None, end=None):
 
-        query = "SELECT * FROM air_quality_measurements"
-        df = pd.read_sql_query(query, self.connection)
+        query, params = self._build_measurement_query(start=start, end=end,
+                                                      select=self._projection(columns))
+        df = pd.read_sql_query(query, self.connection, params=params or None)
         return df
+    
+    def iter_dataframe_chunks(self, columns=None, start=None, end=None, chunksize=10000):
+        """Générateur de DataFrames de `chunksize` lignes lus avec un curseur non bufferisé.
+
+        La projection (columns) et la plage [start, end) sur measured_at sont faites
+        côté serveur. Une connexion dédiée est empruntée au pool pour toute la lecture,
+        la connexion courante reste donc utilisable pendant l'itération.
+        """
+        order_by = 'measured_at' if start is not None or end is not None else 'id'
+        query, params = self._build_measurement_query(start=start, end=end,
+                                                      select=self._projection(columns),
+                                                      order_by=order_by)
+        
+        pool = self._get_pool()
+        conn = pool.acquire()
+        cursor = conn.cursor(buffered=False)
+        try:
+            cursor.execute(query, params)
+            names = list(cursor.column_names)
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                yield pd.DataFrame(rows, columns=names)
+        finally:
+            #itération interrompue: le reste du résultat doit être lu avant de fermer le
+            #curseur non bufferisé ("Unread result found"); la connexion est rendue au
+            #pool dans tous les cas (release() la ferme si elle est inutilisable)
+            try:
+                conn.consume_results()
+                cursor.close()
+            except mysql.connector.Error:
+                pass
+            finally:
+                pool.release(conn)
 
 
 #FONCTIONS DE TEST 
@@ -394,6 +1436,8 @@ def test_database_operations():
     print("\n5. Threshold Filtering Test (Temperature > 20°C)..")
     high_temp = db.get_measurements_by_threshold('temperature', min_value=20)
     print(f"Records with Temperature > 20°C: {len(high_temp)} Rows")
+    db.explain_query('temperature', min_value=20)
+    db.explain_query('co_gt', min_value=5, start="01/01/2005", end="08/01/2005")
     
     #test d'insertion
     print("\n6. New Measurement Insertion Test..")
@@ -426,12 +1470,59 @@ def test_database_operations():
     print(f" DataFrame: {df.shape[0]} rows, {df.shape[1]} columns")
     print(f" Columns: {list(df.columns)}")
     
+    #lecture en flux par morceaux avec projection
+    chunks = db.iter_dataframe_chunks(columns=['measured_at', 'temperature'], chunksize=2000)
+    sizes = [len(chunk) for chunk in chunks]
+    print(f" Streamed {sum(sizes)} rows in {len(sizes)} chunks")
+    
     db.disconnect()
     
+    #réutilisation des connexions
+    print("\n11. Connection Pool Test..")
+    with db.session():
+        db.get_statistics()
+    print(f" Pool: {db.pool_stats()}")
+    
     print("\n" + "=" * 60)
     print("All Tests Passed!")
     print("=" * 60)
 
 
+def benchmark_csv_ingestion(csv_path="AirQualityUCI.csv", batch_sizes=(500, 5000)):
+    #compare l'insertion ligne par ligne et l'insertion par lots
+    #sur une base dédiée pour ne pas toucher aux données réelles
+    
+    print("=" * 60)
+    print("CSV Ingestion Benchmark")
+    print("=" * 60)
+    
+    db = AirQualityDatabase("db_air_quality_bench")
+    db.connect()
+    db.create_tables()
+    
+    runs = [('row-by-row', 'row', 1)] + [(f'bulk (batch={size})', 'bulk', size) for size in batch_sizes]
+    results = {}
+    
+    for label, mode, batch_size in runs:
+        db.cursor.execute("DELETE FROM air_quality_measurements")
+        db.connection.commit()
+        
+        start = time.perf_counter()
+        count = db.load_csv_to_database(csv_path, mode=mode, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        results[label] = count / elapsed if elapsed > 0 else float('inf')
+    
+    db.cursor.execute("DELETE FROM air_quality_measurements")
+    db.connection.commit()
+    db.disconnect()
+    
+    baseline = results['row-by-row']
+    print()
+    for label, rate in results.items():
+        print(f" {label:<20} {rate:>10.0f} rows/s  (x{rate / baseline:.1f})")
+    
+    return results
+
+
 if __name__ == "__main__":
     test_database_operations()
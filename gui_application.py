@@ -7,7 +7,6 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolb
 from matplotlib.figure import Figure
 import seaborn as sns
 from scipy.signal import welch     #calcul DSP
-from scipy import fft
 import cv2
 from PIL import Image, ImageTk
 import os
@@ -16,10 +15,11 @@ from datetime import datetime
 
 # Import des modules du projet
 from database_integration import AirQualityDatabase
-from data_processing import DataProcessor
+from data_processing import DataProcessor, moving_average_2d, rolling_median, hampel_filter
 from correlation_analysis import CorrelationAnalyzer
-from spectral_analysis import SpectralAnalyzer
+from spectral_analysis import SpectralAnalyzer, real_fft_spectrum
 from image_processing import ImageProcessor
+from result_cache import RESULT_CACHE, cache_key, invalidate_results
 
 
 class EnvironmentalDataGUI:
@@ -631,7 +631,8 @@ class EnvironmentalDataGUI:
         
         #type filtre
         ttk.Label(left_frame, text="Filter Type:").pack(anchor=tk.W, pady=(10, 0))
-        self.filter_type = ttk.Combobox(left_frame, values=['Moving Average', 'Threshold Filter'])
+        self.filter_type = ttk.Combobox(left_frame, values=['Moving Average', 'Threshold Filter',
+                                                            'Rolling Median', 'Hampel Filter'])
         self.filter_type.set('Moving Average')
         self.filter_type.pack(fill=tk.X, pady=5)
         
@@ -655,6 +656,12 @@ class EnvironmentalDataGUI:
         self.threshold_max.insert(0, "50")
         self.threshold_max.pack(fill=tk.X, pady=5)
         
+        #filtre de Hampel: nombre d'écarts (MAD) tolérés
+        ttk.Label(left_frame, text="Hampel Sigmas:").pack(anchor=tk.W)
+        self.hampel_sigmas = ttk.Entry(left_frame)
+        self.hampel_sigmas.insert(0, "3")
+        self.hampel_sigmas.pack(fill=tk.X, pady=5)
+        
         ttk.Button(left_frame, text="Apply Filter", command=self.apply_filter).pack(fill=tk.X, pady=20)
         ttk.Button(left_frame, text="Reset", command=self.reset_filter).pack(fill=tk.X, pady=5)
         ttk.Button(left_frame, text="Save Filtered Data to DB", command=self.save_filtered_data).pack(fill=tk.X, pady=5)
@@ -1176,7 +1183,7 @@ Humidity:
                 processor = DataProcessor()
                 processor.load_data_from_csv(file_path)
                 processor.clean_data()
-                processor.store_cleaned_data()
+                processor.store_cleaned_data(upsert=True)
                 
                 self.load_data_from_db()
                 self.log(f"CSV Loaded and Stored: {file_path}")
@@ -1192,7 +1199,7 @@ Humidity:
             try:
                 processor = DataProcessor()
                 processor.cleaned_data = self.data
-                processor.store_cleaned_data()
+                processor.store_cleaned_data(swap=True)
                 self.log("Data saved to the database")
                 messagebox.showinfo("Success", "Data Saved!")
             except Exception as e:
@@ -1205,8 +1212,10 @@ Humidity:
                 self.db.cursor.execute("DELETE FROM air_quality_measurements")
                 # Reset auto-increment for MySQL
                 self.db.cursor.execute("ALTER TABLE air_quality_measurements AUTO_INCREMENT = 1")
+                self.db.clear_filter_runs()
                 self.db.connection.commit()
                 self.db.disconnect()
+                invalidate_results()
                 
                 self.data = pd.DataFrame()
                 self.update_stats()
@@ -1380,6 +1389,10 @@ Humidity:
                     msg += f"  Min: {values['min']}\n"
                     msg += f"  Max: {values['max']}\n\n"
             
+            cache = RESULT_CACHE.stats()
+            msg += (f"Result Cache: {cache['hits']} hits, {cache['misses']} misses, "
+                    f"{cache['entries']} entries ({cache['bytes'] / 2**20:.1f} MB)")
+            
             messagebox.showinfo("Database Statistics", msg)
         except Exception as e:
             messagebox.showerror("Error", str(e))
@@ -1401,7 +1414,7 @@ Humidity:
     #FONCTIONS FILTRAGE 
     
     def apply_filter(self):
-        """Applique le filtre sélectionné (Moving Average ou Thresholding)."""
+        """Applique le filtre sélectionné (Moving Average, Thresholding, Rolling Median ou Hampel)."""
         if self.data is None:
             messagebox.showwarning("Warning", "No data loaded")
             return
@@ -1411,6 +1424,8 @@ Humidity:
         df_column = self.COLUMN_MAP[var_selected]
         
         # Extraire les données originales (sans NaN)
+        # (résultats mémorisés sous des opérations '*_dropna': tableaux calculés sur la
+        # série sans NaN, distincts des Series pleine colonne de DataProcessor)
         original_series = self.data[df_column].dropna()
         original = original_series.values
         
@@ -1418,11 +1433,10 @@ Humidity:
         if filter_type == 'Moving Average':
             # Filtrage par moyenne mobile centrée
             window = int(float(self.window_size.get()))
-            # Appliquer la moyenne mobile centrée
-            filtered_series = pd.Series(original).rolling(window=window, center=True).mean()
-            # Remplir les valeurs NaN aux extrémités
-            filtered_series = filtered_series.fillna(method='bfill').fillna(method='ffill')
-            filtered = filtered_series.values
+            # Moyenne mobile centrée (sommes cumulées), extrémités remplies
+            filtered = RESULT_CACHE.get_or_compute(
+                cache_key(self.data, df_column, 'moving_average_dropna', window_size=window),
+                lambda: moving_average_2d(original, window))
             title = f"Moving Average (window={window})"
             filter_desc = f"Moyenne mobile avec fenêtre de taille {window}"
             
@@ -1443,6 +1457,30 @@ Humidity:
             filtered = np.clip(original, min_val, max_val)
             title = f"Thresholding [{min_val}, {max_val}]"
             filter_desc = f"Seuillage entre {min_val} et {max_val}"
+            
+        elif filter_type == 'Rolling Median':
+            # Médiane glissante centrée (fenêtre triée, sans re-tri)
+            window = int(float(self.window_size.get()))
+            filtered = RESULT_CACHE.get_or_compute(
+                cache_key(self.data, df_column, 'rolling_median_dropna', window_size=window),
+                lambda: rolling_median(original, window))
+            title = f"Rolling Median (window={window})"
+            filter_desc = f"Médiane glissante avec fenêtre de taille {window}"
+            
+        elif filter_type == 'Hampel Filter':
+            # Débruitage local: pics remplacés par la médiane locale
+            window = int(float(self.window_size.get()))
+            try:
+                n_sigmas = float(self.hampel_sigmas.get())
+            except ValueError:
+                messagebox.showerror("Error", "Veuillez entrer une valeur numérique valide pour Hampel Sigmas.")
+                return
+            filtered, replaced = RESULT_CACHE.get_or_compute(
+                cache_key(self.data, df_column, 'hampel_dropna', window_size=window, n_sigmas=n_sigmas),
+                lambda: hampel_filter(original, window, n_sigmas, return_mask=True))
+            title = f"Hampel (window={window}, {n_sigmas:g} sigmas)"
+            filter_desc = (f"Filtre de Hampel, fenêtre {window}, {n_sigmas:g} sigmas: "
+                           f"{int(replaced.sum())} pics remplacés")
         else:
             messagebox.showwarning("Warning", "Type de filtre non reconnu")
             return
@@ -1522,16 +1560,24 @@ Humidity:
         df_column = self.COLUMN_MAP[var_selected]
         filter_type = self.filter_type.get()
         
-        # Récupérer les paramètres du filtre
+        # Récupérer les paramètres du filtre (seuils seulement pour le seuillage,
+        # n_sigmas seulement pour Hampel)
         window_size = int(self.window_size.get())
-        try:
-            threshold_min = float(self.threshold_min.get())
-        except:
-            threshold_min = None
-        try:
-            threshold_max = float(self.threshold_max.get())
-        except:
-            threshold_max = None
+        threshold_min = threshold_max = n_sigmas = None
+        if filter_type == 'Threshold Filter':
+            try:
+                threshold_min = float(self.threshold_min.get())
+            except:
+                threshold_min = None
+            try:
+                threshold_max = float(self.threshold_max.get())
+            except:
+                threshold_max = None
+        elif filter_type == 'Hampel Filter':
+            try:
+                n_sigmas = float(self.hampel_sigmas.get())
+            except ValueError:
+                n_sigmas = None
         
         try:
             self.db.connect()
@@ -1539,34 +1585,34 @@ Humidity:
             # Get the indices of non-null values in the original column
             original_series = self.data[df_column].dropna()
             
-            # Stocker chaque ligne filtrée dans l'historique
-            saved_count = 0
-            for i, (idx, original_value) in enumerate(original_series.items()):
-                if i < len(self.filtered_data):
-                    # Get the record id for this row
-                    record_id = self.data.loc[idx, 'id']
-                    filtered_value = float(self.filtered_data[i])
-                    
-                    # Insérer dans l'historique des données filtrées
-                    self.db.insert_filtered_data(
-                        original_record_id=int(record_id),
-                        variable_name=var_selected,
-                        filter_type=filter_type,
-                        window_size=window_size,
-                        threshold_min=threshold_min,
-                        threshold_max=threshold_max,
-                        original_value=float(original_value),
-                        filtered_value=filtered_value,
-                        row_index=int(idx)
-                    )
-                    saved_count += 1
+            # Aligner index, ids et valeurs filtrées une seule fois (vectorisé)
+            n = min(len(original_series), len(self.filtered_data))
+            original_series = original_series.iloc[:n]
+            record_ids = self.data.loc[original_series.index, 'id'].to_numpy()
+            
+            # Stocker l'exécution en format compact (en-tête + tableaux binaires)
+            self.db.store_filter_run(
+                original_record_ids=record_ids,
+                variable_name=var_selected,
+                filter_type=filter_type,
+                window_size=window_size,
+                threshold_min=threshold_min,
+                threshold_max=threshold_max,
+                original_values=original_series.to_numpy(),
+                filtered_values=np.asarray(self.filtered_data[:n]),
+                row_indices=original_series.index.to_numpy(),
+                n_sigmas=n_sigmas
+            )
+            saved_count = n
             
             self.db.disconnect()
             
             # Log détaillé du filtre sauvegardé
             filter_params = f"Filter: {filter_type}"
-            if filter_type == 'Moving Average':
+            if filter_type in ('Moving Average', 'Rolling Median', 'Hampel Filter'):
                 filter_params += f", Window: {window_size}"
+                if n_sigmas is not None:
+                    filter_params += f", Sigmas: {n_sigmas:g}"
             else:
                 filter_params += f", Min: {threshold_min}, Max: {threshold_max}"
             
@@ -1608,7 +1654,8 @@ Humidity:
         
         # Filter type filter
         ttk.Label(filter_frame, text="Filter Type:").pack(side=tk.LEFT, padx=5)
-        type_filter = ttk.Combobox(filter_frame, values=['All', 'Moving Average', 'Threshold Filter'], state="readonly", width=20)
+        type_filter = ttk.Combobox(filter_frame, values=['All', 'Moving Average', 'Threshold Filter',
+                                                      'Rolling Median', 'Hampel Filter'], state="readonly", width=20)
         type_filter.set('All')
         type_filter.pack(side=tk.LEFT, padx=5)
         
@@ -1617,7 +1664,7 @@ Humidity:
         tree_frame.pack(fill=tk.BOTH, expand=True)
         
         columns = ('ID', 'Record ID', 'Variable', 'Filter Type', 'Window', 'Min', 'Max', 
-                   'Original', 'Filtered', 'Row Index', 'Applied At')
+                   'Sigmas', 'Original', 'Filtered', 'Row Index', 'Applied At')
         history_tree = ttk.Treeview(tree_frame, columns=columns, show='headings', height=20)
         
         # Configuration des colonnes
@@ -1628,6 +1675,7 @@ Humidity:
         history_tree.heading('Window', text='Window Size')
         history_tree.heading('Min', text='Min Threshold')
         history_tree.heading('Max', text='Max Threshold')
+        history_tree.heading('Sigmas', text='Hampel Sigmas')
         history_tree.heading('Original', text='Original Value')
         history_tree.heading('Filtered', text='Filtered Value')
         history_tree.heading('Row Index', text='Row Index')
@@ -1641,6 +1689,7 @@ Humidity:
         history_tree.column('Window', width=80)
         history_tree.column('Min', width=80)
         history_tree.column('Max', width=80)
+        history_tree.column('Sigmas', width=80)
         history_tree.column('Original', width=100)
         history_tree.column('Filtered', width=100)
         history_tree.column('Row Index', width=80)
@@ -1679,7 +1728,7 @@ Humidity:
                 for row in history_data:
                     # Format: (id, original_record_id, variable_name, filter_type, window_size,
                     #          threshold_min, threshold_max, original_value, filtered_value, 
-                    #          row_index, applied_at)
+                    #          row_index, applied_at, n_sigmas)
                     values = (
                         row[0],  # id
                         row[1],  # original_record_id
@@ -1688,6 +1737,7 @@ Humidity:
                         row[4] if row[4] else '-',  # window_size
                         f"{row[5]:.2f}" if row[5] is not None else '-',  # threshold_min
                         f"{row[6]:.2f}" if row[6] is not None else '-',  # threshold_max
+                        f"{row[11]:g}" if row[11] is not None else '-',  # n_sigmas
                         f"{row[7]:.2f}" if row[7] is not None else '-',  # original_value
                         f"{row[8]:.2f}" if row[8] is not None else '-',  # filtered_value
                         row[9],  # row_index
@@ -1729,7 +1779,9 @@ Humidity:
         
         cols = [self.COLUMN_MAP[col] for col in self.display_columns if self.COLUMN_MAP[col] in self.data.columns]
         
-        corr_matrix = self.data[cols].corr(method=method)
+        corr_matrix = RESULT_CACHE.get_or_compute(
+            cache_key(self.data, cols, 'corr', method=method),
+            lambda: self.data[cols].corr(method=method))
         inverse_map = {v: k for k, v in self.COLUMN_MAP.items()}
         corr_matrix = corr_matrix.rename(index=inverse_map, columns=inverse_map)
         self.corr_fig.clear()
@@ -1825,6 +1877,7 @@ Humidity:
             # ============ APPLY FILTERS BEFORE ANALYSIS ============
             filter_info = ""
             filter_type = self.spectral_filter_type.get()
+            filter_params = {}
             show_comparison = False
             
             fs = 1.0  # Sampling frequency (1 sample per hour)
@@ -1845,6 +1898,7 @@ Humidity:
                     sos = butter(order, cutoff, btype='low', fs=fs, output='sos')
                     signal_filtered = sosfilt(sos, signal_filtered)
                     filter_info = f" + Low-pass ({cutoff} Hz)"
+                    filter_params = {'cutoff': cutoff}
                     show_comparison = True
                     
                 elif filter_type == 'High-pass':
@@ -1855,6 +1909,7 @@ Humidity:
                     sos = butter(order, cutoff, btype='high', fs=fs, output='sos')
                     signal_filtered = sosfilt(sos, signal_filtered)
                     filter_info = f" + High-pass ({cutoff} Hz)"
+                    filter_params = {'cutoff': cutoff}
                     show_comparison = True
                     
                 elif filter_type == 'Band-pass':
@@ -1866,6 +1921,7 @@ Humidity:
                     sos = butter(order, [low_cut, high_cut], btype='band', fs=fs, output='sos')
                     signal_filtered = sosfilt(sos, signal_filtered)
                     filter_info = f" + Band-pass ({low_cut}-{high_cut} Hz)"
+                    filter_params = {'low_cut': low_cut, 'high_cut': high_cut}
                     show_comparison = True
                 elif filter_type == 'Band-stop':
                     # Coupe-bande: remove frequencies between low_cut and high_cut
@@ -1877,6 +1933,7 @@ Humidity:
                     sos = butter(order, [low_cut, high_cut], btype='bandstop', fs=fs, output='sos')
                     signal_filtered = sosfilt(sos, signal_filtered)
                     filter_info = f" + Band-stop ({low_cut}-{high_cut} Hz)"
+                    filter_params = {'low_cut': low_cut, 'high_cut': high_cut}
                     show_comparison = True
             except ValueError as e:
                 messagebox.showerror("Error", f"Invalid filter parameters: {e}")
@@ -1884,6 +1941,9 @@ Humidity:
             
             # Use filtered signal for analysis
             signal = signal_filtered
+            # Spectre mémorisé par (données, variable, représentation, filtre)
+            spectrum_key = lambda operation: cache_key(self.data, var_fft, operation,
+                                                       filter_type=filter_type, **filter_params)
             
             # ============ SPECTRAL ANALYSIS ON FILTERED SIGNAL ============
             self.spectral_fig.clear()
@@ -1906,12 +1966,10 @@ Humidity:
             # Choose representation type
             if repr_type == 'FFT Amplitude':
                 # ===== FFT AMPLITUDE =====
-                n = len(signal)
-                fft_result = fft.fft(signal)
-                frequencies = fft.fftfreq(n, d=1.0)
-                positive_mask = frequencies >= 0
-                frequencies = frequencies[positive_mask]
-                amplitudes = np.abs(fft_result[positive_mask]) * 2 / n
+                # FFT réelle (demi-spectre), longueur rapide pour les longues séries
+                frequencies, amplitudes = RESULT_CACHE.get_or_compute(
+                    spectrum_key('fft_amplitude'),
+                    lambda: real_fft_spectrum(signal, fs=fs)[:2])
                 
                 # Plot FFT Amplitude
                 plot_limit = len(frequencies) // 2
@@ -1942,7 +2000,8 @@ Humidity:
                 if nperseg < 4:
                     nperseg = len(signal)
                     
-                frequencies, power = welch(signal, fs=1.0, nperseg=nperseg)
+                frequencies, power = RESULT_CACHE.get_or_compute(
+                    spectrum_key('welch'), lambda: welch(signal, fs=1.0, nperseg=nperseg))
                 
                 # Plot Power Spectrum
                 ax2.semilogy(frequencies, power, 'r-', linewidth=1)
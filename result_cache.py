@@ -0,0 +1,178 @@
+"""
+Cache des Résultats d'Analyse
+=============================
+Ce module mémorise les résultats de calculs coûteux (filtres, corrélations,
+spectres) partagés par DataProcessor, CorrelationAnalyzer, SpectralAnalyzer
+et l'interface graphique.
+
+Fonctionnalités:
+- Clés (empreinte des données, colonne, opération, paramètres)
+- Éviction LRU bornée en octets
+- Statistiques hits/misses
+- Invalidation lors des modifications des données (base, imports CSV)
+"""
+
+import hashlib
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+def estimate_nbytes(value):
+    #taille approximative d'un résultat (tableaux, DataFrames, conteneurs)
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    #cache LRU thread-safe, borné par la taille totale des résultats en octets
+    
+    def __init__(self, max_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+        self._entries = OrderedDict()  #clé -> (valeur, taille)
+        self._lock = threading.Lock()
+    
+    def __len__(self):
+        return len(self._entries)
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key, value):
+        size = estimate_nbytes(value)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            #un résultat plus grand que tout le cache n'est pas conservé
+            if size > self.max_bytes:
+                return value
+            
+            self._entries[key] = (value, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+    
+    def get_or_compute(self, key, compute):
+        """Retourne le résultat mémorisé pour key, ou le calcule et le mémorise.
+
+        Les résultats sont partagés: ils ne doivent pas être modifiés en place.
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = self.put(key, compute())
+        return value
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+    
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+#cache partagé par tout le processus
+RESULT_CACHE = ResultCache()
+
+#version des données: incrémentée à chaque modification de la base ou import
+_DATA_VERSION = 0
+_FINGERPRINTS = {}  #id(objet) -> (weakref, version, empreinte)
+_VERSION_LOCK = threading.Lock()
+
+
+def data_version():
+    return _DATA_VERSION
+
+
+def invalidate_results():
+    """À appeler après toute modification des données: vide le cache partagé."""
+    global _DATA_VERSION
+    with _VERSION_LOCK:
+        _DATA_VERSION += 1
+        _FINGERPRINTS.clear()
+    RESULT_CACHE.clear()
+
+
+def _hash_data(data):
+    digest = hashlib.blake2b(digest_size=16)
+    if isinstance(data, pd.DataFrame):
+        digest.update(repr((list(data.columns), list(data.dtypes))).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    elif isinstance(data, pd.Series):
+        digest.update(repr((data.name, data.dtype)).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    else:
+        array = np.ascontiguousarray(data)
+        digest.update(repr((array.shape, array.dtype.str)).encode())
+        digest.update(array.view(np.uint8).tobytes() if array.size else b'')
+    return digest.hexdigest()
+
+
+def fingerprint(data):
+    """Empreinte du contenu d'un tableau/DataFrame (mémorisée par objet et par version).
+
+    Un même objet n'est haché qu'une fois tant que les données ne sont pas invalidées:
+    les DataFrames ne doivent donc pas être modifiés en place entre deux appels.
+    """
+    if data is None:
+        return None
+    key = id(data)
+    with _VERSION_LOCK:
+        entry = _FINGERPRINTS.get(key)
+        version = _DATA_VERSION
+    if entry is not None and entry[0]() is data and entry[1] == version:
+        return entry[2]
+    
+    value = _hash_data(data)
+    try:
+        ref = weakref.ref(data, lambda _, key=key: _FINGERPRINTS.pop(key, None))
+    except TypeError:
+        return value
+    with _VERSION_LOCK:
+        _FINGERPRINTS[key] = (ref, version, value)
+    return value
+
+
+def cache_key(data, column, operation, **params):
+    #clé normalisée: (empreinte, colonne, opération, paramètres triés)
+    if isinstance(column, list):
+        column = tuple(column)
+    return (fingerprint(data), column, operation, tuple(sorted(params.items())))
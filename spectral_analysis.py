@@ -9,15 +9,293 @@ Fonctionnalités:
 - Identification des fréquences dominantes
 - Stockage des résultats dans la base de données
 - Visualisation des spectres de puissance
+- Spectrogrammes (TFCT glissante, mise à jour incrémentale)
+- DSP de Welch en flux (lecture de la base par morceaux)
 """
 
 import pandas as pd
 import numpy as np
 from scipy import fft
-from scipy.signal import periodogram, welch
+from scipy.signal import periodogram, welch, get_window
+from numpy.lib.stride_tricks import sliding_window_view
 import matplotlib.pyplot as plt
 from database_integration import AirQualityDatabase
 from data_processing import DataProcessor
+from result_cache import ResultCache
+import json
+import time
+
+
+#séries longues: complétion à une longueur rapide et transformées multithreadées
+FAST_LENGTH_MIN_POINTS = 1 << 16
+PARALLEL_FFT_MIN_POINTS = 1 << 18
+
+#taille du cache spectral propre à chaque analyseur
+SPECTRAL_CACHE_BYTES = 64 * 2**20
+
+
+def real_fft_spectrum(signal, fs=1.0, pad_fast='auto', workers=None):
+    """Demi-spectre (fréquences, amplitudes, phases) d'un signal réel le long de l'axe 0.
+
+    pad_fast: complétion à next_fast_len ('auto': à partir de FAST_LENGTH_MIN_POINTS).
+    """
+    signal = np.asarray(signal, dtype=float)
+    n = signal.shape[0]
+    if pad_fast == 'auto':
+        pad_fast = n >= FAST_LENGTH_MIN_POINTS
+    n_fft = fft.next_fast_len(n, real=True) if pad_fast and n else n
+    if workers is None:
+        workers = -1 if signal.size >= PARALLEL_FFT_MIN_POINTS else 1
+    
+    spectrum = fft.rfft(signal, n=n_fft, axis=0, workers=workers)
+    frequencies = fft.rfftfreq(n_fft, d=1 / fs)
+    return frequencies, np.abs(spectrum) * 2 / n, np.angle(spectrum)
+
+
+def power_spectrum(signal, fs=1.0, method='periodogram'):
+    """DSP d'un signal centré (axe 0): 'periodogram' ou 'welch' (nperseg=min(256, n//4)).
+
+    Un tableau 2D (échantillons x colonnes) est traité en un seul appel vectorisé.
+    """
+    if method == 'periodogram':
+        return periodogram(signal, fs=fs, axis=0)
+    if method == 'welch':
+        return welch(signal, fs=fs, nperseg=min(256, len(signal)//4), axis=0)
+    raise ValueError(f"Unknown Method: {method}")
+
+
+def dominant_peaks(frequencies, spectra, n_peaks=5):
+    """Pics dominants de spectres empilés (fréquences x colonnes), hors composante DC.
+
+    Sélection par argpartition le long de l'axe 0 puis tri des seuls n_peaks retenus.
+    Retourne (fréquences des pics, valeurs des pics), de forme (n_peaks, colonnes),
+    par valeur décroissante.
+    """
+    spectra = np.asarray(spectra)
+    squeeze = spectra.ndim == 1
+    if squeeze:
+        spectra = spectra[:, None]
+    
+    mask = frequencies > 0
+    frequencies = frequencies[mask]
+    spectra = spectra[mask]
+    n_peaks = min(n_peaks, len(frequencies))
+    if n_peaks <= 0:
+        raise ValueError("Spectrum Has No Positive Frequency.")
+    
+    top = np.argpartition(spectra, -n_peaks, axis=0)[-n_peaks:]
+    values = np.take_along_axis(spectra, top, axis=0)
+    order = np.argsort(-values, axis=0, kind='stable')
+    top = np.take_along_axis(top, order, axis=0)
+    values = np.take_along_axis(values, order, axis=0)
+    peak_frequencies = frequencies[top]
+    
+    if squeeze:
+        return peak_frequencies[:, 0], values[:, 0]
+    return peak_frequencies, values
+
+
+def _peak_table(peak_frequencies, peak_values, value_label='Amplitude'):
+    #table des pics d'une colonne (fréquence, valeur, période en heures et en jours)
+    with np.errstate(divide='ignore'):
+        period_hours = 1 / peak_frequencies
+    return pd.DataFrame({
+        'Frequency (Hz)': peak_frequencies,
+        value_label: peak_values,
+        'Period (hours)': period_hours,
+        'Period (days)': period_hours / 24,
+    })
+
+
+class SpectrogramEngine:
+    """Spectrogramme par TFCT glissante (fenêtre, pas et apodisation configurables).
+
+    Mêmes conventions que scipy.signal.spectrogram (détrend constant, DSP unilatérale,
+    scaling='density', trames complètes seulement): power est de forme
+    (fréquences x trames), times donne le centre de chaque trame en unités de 1/fs.
+    update() ne calcule que les trames complétées par les nouveaux échantillons; seuls
+    les window - hop derniers échantillons sont conservés entre deux appels.
+    keep_frames=False ne conserve pas les trames (update() les renvoie seulement).
+    """
+    
+    def __init__(self, window=336, hop=24, taper='hann', fs=1.0, keep_frames=True):
+        #336 h (deux semaines) résout le cycle hebdomadaire; une trame par jour
+        if window < 2 or not 0 < hop <= window:
+            raise ValueError("Expected window >= 2 and 0 < hop <= window.")
+        
+        self.window = int(window)
+        self.hop = int(hop)
+        self.taper = tuple(taper) if isinstance(taper, list) else taper
+        self.fs = fs
+        self.keep_frames = keep_frames
+        self.origin = None  #horodatage du premier échantillon (optionnel)
+        
+        self._taper = get_window(self.taper, self.window)
+        self._scale = np.full(self.window // 2 + 1, 2 / (fs * np.sum(self._taper ** 2)))
+        self._scale[0] /= 2
+        if self.window % 2 == 0:
+            self._scale[-1] /= 2
+        self.frequencies = fft.rfftfreq(self.window, d=1 / fs)
+        self.reset()
+    
+    def reset(self):
+        self.n_samples = 0
+        self.n_frames = 0
+        self._buffer = np.empty(0)
+        self._frames = []
+        self._power = None
+    
+    def _transform(self, segments):
+        #segments (trames x window) -> DSP (fréquences x trames)
+        segments = segments - segments.mean(axis=1, keepdims=True)
+        spectrum = fft.rfft(segments * self._taper, axis=1)
+        return (np.abs(spectrum) ** 2 * self._scale).T
+    
+    def update(self, samples):
+        """Ajoute des échantillons et calcule les seules nouvelles trames.
+
+        Retourne (times, power) des nouvelles trames (éventuellement vides).
+        """
+        samples = np.asarray(samples, dtype=float).ravel()
+        buffer = np.concatenate([self._buffer, samples]) if len(self._buffer) else samples
+        self.n_samples += len(samples)
+        
+        n_new = (len(buffer) - self.window) // self.hop + 1 if len(buffer) >= self.window else 0
+        first = self.n_frames
+        if n_new:
+            segments = sliding_window_view(buffer, self.window)[::self.hop][:n_new]
+            power = self._transform(segments)
+            if self.keep_frames:
+                self._frames.append(power)
+                self._power = None
+            self.n_frames += n_new
+        else:
+            power = np.empty((len(self.frequencies), 0))
+        
+        #le tampon recommence au début de la prochaine trame
+        self._buffer = buffer[n_new * self.hop:].copy()
+        return self._frame_times(first, self.n_frames), power
+    
+    def compute(self, signal):
+        #spectrogramme complet d'un signal: (fréquences, temps, puissance)
+        self.reset()
+        self.update(signal)
+        return self.frequencies, self.times, self.power
+    
+    def _frame_times(self, start, stop):
+        return (np.arange(start, stop) * self.hop + self.window / 2) / self.fs
+    
+    @property
+    def times(self):
+        return self._frame_times(0, self.n_frames)
+    
+    @property
+    def power(self):
+        if self._power is None:
+            if len(self._frames) > 1:
+                self._frames = [np.concatenate(self._frames, axis=1)]
+            self._power = self._frames[0] if self._frames else np.empty((len(self.frequencies), 0))
+        return self._power
+    
+    def timestamps(self):
+        #centres des trames en dates (origin + temps en heures), si origin est connu
+        if self.origin is None:
+            return None
+        return np.datetime64(self.origin, 's') + (self.times * 3600).astype('timedelta64[s]')
+    
+    def save(self, path):
+        """Sauvegarde compacte (.npz compressé, puissance en float32).
+
+        Le tampon de recouvrement est conservé: un moteur rechargé reprend update().
+        """
+        np.savez_compressed(
+            path,
+            power=self.power.astype(np.float32),
+            buffer=self._buffer,
+            params=np.array([self.window, self.hop, self.n_samples], dtype=np.int64),
+            fs=np.float64(self.fs),
+            taper=np.array(json.dumps(self.taper)),
+            origin=np.array('' if self.origin is None else str(np.datetime64(self.origin, 's'))))
+        print(f"Spectrogram Saved: {path} ({self.n_frames} frames)")
+    
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as archive:
+            window, hop, n_samples = (int(value) for value in archive['params'])
+            engine = cls(window, hop, json.loads(str(archive['taper'])), float(archive['fs']))
+            power = archive['power']
+            engine._buffer = archive['buffer']
+            origin = str(archive['origin'])
+        
+        engine.n_samples = n_samples
+        engine.n_frames = power.shape[1]
+        engine._frames = [power] if engine.n_frames else []
+        engine.origin = np.datetime64(origin) if origin else None
+        return engine
+
+
+class StreamingWelch:
+    """DSP de Welch en ligne: moyenne courante des périodogrammes de segments.
+
+    Mêmes paramètres par défaut que scipy.signal.welch (hann, noverlap=nperseg//2,
+    détrend constant, densité unilatérale): après update() de tout le signal, par
+    morceaux de tailles quelconques, psd est égale à welch(signal, nperseg=...).
+    Seuls les nperseg - hop derniers échantillons sont gardés entre deux morceaux.
+    """
+    
+    def __init__(self, nperseg=256, noverlap=None, window='hann', fs=1.0):
+        if noverlap is None:
+            noverlap = nperseg // 2
+        if not 0 <= noverlap < nperseg:
+            raise ValueError("Expected 0 <= noverlap < nperseg.")
+        
+        self.nperseg = int(nperseg)
+        self.noverlap = int(noverlap)
+        self._engine = SpectrogramEngine(nperseg, nperseg - noverlap, window, fs, keep_frames=False)
+        self._sum = np.zeros(len(self._engine.frequencies))
+        self.n_segments = 0
+    
+    @property
+    def frequencies(self):
+        return self._engine.frequencies
+    
+    @property
+    def n_samples(self):
+        return self._engine.n_samples
+    
+    @property
+    def psd(self):
+        if self.n_segments == 0:
+            raise ValueError(f"Not Enough Samples: {self.n_samples} < nperseg={self.nperseg}.")
+        return self._sum / self.n_segments
+    
+    def update(self, samples):
+        #ajoute un morceau du signal; seuls les segments complétés sont calculés
+        _, power = self._engine.update(samples)
+        if power.shape[1]:
+            self._sum += power.sum(axis=1)
+            self.n_segments += power.shape[1]
+        return self
+    
+    def snapshot(self):
+        #estimation courante (fréquences, DSP), indépendante des mises à jour suivantes
+        return self.frequencies.copy(), self.psd
+    
+    def merge(self, other):
+        """Fusionne l'estimation d'un flux indépendant (autre station, autre période).
+
+        Moyenne pondérée par le nombre de segments; aucun segment n'est formé à
+        cheval sur les deux flux. Le tampon de recouvrement conservé est celui de self.
+        """
+        engine, theirs = self._engine, other._engine
+        if (self.nperseg, self.noverlap, engine.taper, engine.fs) != \
+                (other.nperseg, other.noverlap, theirs.taper, theirs.fs):
+            raise ValueError("Cannot Merge Estimators With Different Parameters.")
+        
+        self._sum += other._sum
+        self.n_segments += other.n_segments
+        engine.n_samples += theirs.n_samples
+        return self
 
 
 class SpectralAnalyzer:
@@ -25,19 +303,39 @@ class SpectralAnalyzer:
     def __init__(self, db_path="db_air_quality"):
 
         self.db = AirQualityDatabase(db_path)
+        #demi-spectres, PSD et pics par (colonne, version des données, méthode, paramètres)
+        self.spectral_cache = ResultCache(max_bytes=SPECTRAL_CACHE_BYTES)
+        self.data_version = 0
         self.data = None
         self.sampling_rate = 1.0  # 1 échantillon par heure
     
+    @property
+    def data(self):
+        return self._data
+    
+    @data.setter
+    def data(self, value):
+        #toute nouvelle affectation des données change de version: les spectres
+        #mémorisés de l'ancienne version ne seront plus jamais demandés
+        self._data = value
+        self.data_version += 1
+        self.spectral_cache.clear()
+    
+    def _spectral_key(self, column, operation, **params):
+        #la fréquence d'échantillonnage fait partie des paramètres de tout spectre
+        params['sampling_rate'] = self.sampling_rate
+        return (column, self.data_version, operation, tuple(sorted(params.items())))
+    
     def load_data(self):
     
-        self.db.connect()
-        self.data = self.db.get_data_as_dataframe()
-        self.db.disconnect()
+        with self.db.session():
+            self.data = self.db.get_data_as_dataframe()
         
         print(f"Data Loaded: {len(self.data)} Records")
         return self.data
     
-    def apply_fft(self, column):
+    def apply_fft(self, column, pad_fast='auto', workers=None):
+        #demi-spectre par FFT réelle (voir real_fft_spectrum)
 
         if self.data is None:
             self.load_data()
@@ -49,23 +347,13 @@ class SpectralAnalyzer:
         signal = self.data[column].dropna().values
         n = len(signal)
         
-        #soustraire la moyenne (composante DC)
-        signal = signal - np.mean(signal)
-        
-        # Appliquer la FFT
-        fft_result = fft.fft(signal)
-        
-        # Calculer les fréquences
-        frequencies = fft.fftfreq(n, d=1/self.sampling_rate)
-        
-        #garder que les fréquences positives
-        positive_mask = frequencies >= 0
-        frequencies = frequencies[positive_mask]
-        fft_result = fft_result[positive_mask]
+        def compute():
+            #soustraire la moyenne (composante DC), puis FFT réelle: fréquences positives seulement
+            return real_fft_spectrum(signal - np.mean(signal), fs=self.sampling_rate,
+                                     pad_fast=pad_fast, workers=workers)
         
-        # Calcul l'amplitude et la phase
-        amplitudes = np.abs(fft_result) * 2 / n
-        phases = np.angle(fft_result)
+        frequencies, amplitudes, phases = self.spectral_cache.get_or_compute(
+            self._spectral_key(column, 'fft', pad_fast=pad_fast), compute)
         
         print(f"FFT Applied on '{column}'")
         print(f"  - Points: {n}")
@@ -78,81 +366,223 @@ class SpectralAnalyzer:
         if self.data is None:
             self.load_data()
         
-        signal = self.data[column].dropna().values
-        signal = signal - np.mean(signal)
+        if column not in self.data.columns:
+            raise ValueError(f"Column '{column}' Not Found.")
         
-        if method == 'periodogram':
-            frequencies, power = periodogram(signal, fs=self.sampling_rate)
-        else:  # welch
-            frequencies, power = welch(signal, fs=self.sampling_rate, nperseg=min(256, len(signal)//4))
+        def compute():
+            signal = self.data[column].dropna().values
+            signal = signal - np.mean(signal)
+            return power_spectrum(signal, fs=self.sampling_rate, method=method)
+        
+        frequencies, power = self.spectral_cache.get_or_compute(
+            self._spectral_key(column, 'power_spectrum', method=method), compute)
         
         print(f"Power Spectrum Calculated ({method}) for '{column}'")
         return frequencies, power
     
+    def compute_power_spectrum_streaming(self, column, nperseg=256, chunksize=10000,
+                                         start=None, end=None, estimator=None):
+        """DSP de Welch d'une colonne lue en flux depuis la base (StreamingWelch).
+
+        Le signal n'est jamais chargé en entier; les NaN sont retirés morceau par
+        morceau comme dans compute_power_spectrum. Un estimator existant peut être
+        passé pour prolonger une estimation (ex. start = dernier horodatage traité).
+        Retourne (fréquences, DSP, estimator).
+        """
+        if estimator is None:
+            estimator = StreamingWelch(nperseg, fs=self.sampling_rate)
+        
+        for chunk in self.db.iter_dataframe_chunks(columns=[column], start=start, end=end,
+                                                   chunksize=chunksize):
+            estimator.update(chunk[column].dropna().to_numpy(dtype=float))
+        
+        frequencies, power = estimator.snapshot()
+        print(f"Streaming Welch Power Spectrum for '{column}': "
+              f"{estimator.n_segments} segments, {estimator.n_samples} samples")
+        return frequencies, power, estimator
+    
     def find_dominant_frequencies(self, column, n_peaks=5):
+        #table des pics mémorisée (partagée: ne pas la modifier en place)
 
-        frequencies, amplitudes, _ = self.apply_fft(column)
-        
-        #exclure la fréquence 0 (composante DC)
-        mask = frequencies > 0
-        frequencies = frequencies[mask]
-        amplitudes = amplitudes[mask]
+        def compute():
+            frequencies, amplitudes, _ = self.apply_fft(column)
+            return _peak_table(*dominant_peaks(frequencies, amplitudes, n_peaks))
         
-        #trouver les indices des pics les plus grands
-        peak_indices = np.argsort(amplitudes)[-n_peaks:][::-1]
-        
-        results = []
-        for idx in peak_indices:
-            freq = frequencies[idx]
-            amp = amplitudes[idx]
-            period_hours = 1 / freq if freq > 0 else np.inf
-            period_days = period_hours / 24
-            
-            results.append({
-                'Frequency (Hz)': freq,
-                'Amplitude': amp,
-                'Period (hours)': period_hours,
-                'Period (days)': period_days
-            })
+        if self.data is None:
+            self.load_data()
         
-        df = pd.DataFrame(results)
+        df = self.spectral_cache.get_or_compute(
+            self._spectral_key(column, 'peaks', n_peaks=n_peaks), compute)
         
         print(f"\n Top {n_peaks} Dominant Frequencies for '{column}':")
         print(df.to_string(index=False))
         
         return df
     
-    def store_spectral_results(self, column):
+    def analyze_columns(self, columns, method='fft', n_peaks=5):
+        """Spectres de plusieurs colonnes en un seul appel vectorisé (FFT réelle ou DSP).
 
-        frequencies, power = self.compute_power_spectrum(column)
-        dominant = self.find_dominant_frequencies(column, n_peaks=1)
+        Les colonnes de même longueur utile (NaN retirés) sont empilées dans un
+        tableau 2D (échantillons x colonnes) transformé le long de l'axe 0; les pics
+        dominants sont extraits pour toutes les colonnes à la fois. Les résultats
+        alimentent le cache spectral: apply_fft / compute_power_spectrum /
+        find_dominant_frequencies sur ces colonnes ne recalculent plus rien.
+        Retourne (spectres, pics): spectres[colonne] = (fréquences, amplitudes ou DSP),
+        pics = DataFrame (Column, Rank, Frequency, Amplitude ou Power, périodes).
+        """
+        if method not in ('fft', 'periodogram', 'welch'):
+            raise ValueError(f"Unknown Method: {method}")
+        
+        if self.data is None:
+            self.load_data()
+        
+        missing = [column for column in columns if column not in self.data.columns]
+        if missing:
+            raise ValueError(f"Columns Not Found: {missing}")
+        
+        if method == 'fft':
+            spectrum_key = lambda column: self._spectral_key(column, 'fft', pad_fast='auto')
+        else:
+            spectrum_key = lambda column: self._spectral_key(column, 'power_spectrum', method=method)
+        
+        #colonnes absentes du cache, regroupées par longueur utile
+        spectra = {}
+        groups = {}
+        for column in dict.fromkeys(columns):
+            cached = self.spectral_cache.get(spectrum_key(column))
+            if cached is not None:
+                spectra[column] = cached
+                continue
+            signal = self.data[column].dropna().to_numpy(dtype=float)
+            groups.setdefault(len(signal), []).append((column, signal))
+        
+        for group in groups.values():
+            names = [column for column, _ in group]
+            block = np.column_stack([signal for _, signal in group])
+            block -= block.mean(axis=0)
+            
+            if method == 'fft':
+                frequencies, amplitudes, phases = real_fft_spectrum(block, fs=self.sampling_rate)
+                for j, column in enumerate(names):
+                    #copies contiguës: une colonne mémorisée ne retient pas tout le bloc
+                    spectra[column] = self.spectral_cache.put(
+                        spectrum_key(column),
+                        (frequencies, np.ascontiguousarray(amplitudes[:, j]),
+                         np.ascontiguousarray(phases[:, j])))
+            else:
+                frequencies, power = power_spectrum(block, fs=self.sampling_rate, method=method)
+                for j, column in enumerate(names):
+                    spectra[column] = self.spectral_cache.put(
+                        spectrum_key(column), (frequencies, np.ascontiguousarray(power[:, j])))
+        
+        #pics: un appel vectorisé par grille de fréquences commune
+        value_label = 'Amplitude' if method == 'fft' else 'Power'
+        names = list(spectra)
+        by_grid = {}
+        for column in names:
+            frequencies = spectra[column][0]
+            grid_key = (len(frequencies), float(frequencies[1]) if len(frequencies) > 1 else 0.0)
+            by_grid.setdefault(grid_key, []).append(column)
+        
+        tables = {}
+        for grid in by_grid.values():
+            frequencies = spectra[grid[0]][0]
+            stacked = np.column_stack([spectra[column][1] for column in grid])
+            peak_frequencies, peak_values = dominant_peaks(frequencies, stacked, n_peaks)
+            for j, column in enumerate(grid):
+                table = _peak_table(peak_frequencies[:, j], peak_values[:, j], value_label)
+                if method == 'fft':
+                    self.spectral_cache.put(
+                        self._spectral_key(column, 'peaks', n_peaks=n_peaks), table)
+                tables[column] = table
+        
+        peaks = pd.concat(
+            [tables[column].assign(Column=column, Rank=np.arange(1, len(tables[column]) + 1))
+             for column in names],
+            ignore_index=True)
+        peaks = peaks[['Column', 'Rank'] + [c for c in peaks.columns if c not in ('Column', 'Rank')]]
+        
+        spectra = {column: (spectra[column][0], spectra[column][1]) for column in names}
+        print(f"Batched Spectral Analysis ({method}) on {len(names)} Columns "
+              f"({sum(len(g) for g in groups.values())} Computed)")
+        return spectra, peaks
+    
+    def store_spectral_results(self, column, method='periodogram'):
+        #column: une colonne ou une liste de colonnes (calcul groupé, une seule session)
+        columns = [column] if isinstance(column, str) else list(column)
+        
+        spectra, _ = self.analyze_columns(columns, method=method, n_peaks=1)
+        _, peaks = self.analyze_columns(columns, method='fft', n_peaks=1)
+        dominant = peaks.set_index('Column')['Frequency (Hz)']
+        
+        with self.db.session():
+            for name in columns:
+                frequencies, power = spectra[name]
+                
+                #spectre complet en binaire; la grille est décrite par (n_points, fs)
+                n_points = int(round(self.sampling_rate / frequencies[1])) if len(frequencies) > 1 else 1
+                self.db.store_spectrum(name, dominant[name], power, n_points,
+                                       self.sampling_rate, method)
+                
+                print(f"Spectral Results Stored for '{name}' ({len(power)} bins)")
+    
+    def compute_spectrogram(self, column, window=336, hop=24, taper='hann', save_path=None):
+        """Spectrogramme d'une colonne (SpectrogramEngine, réutilisable avec update()).
 
-        dominant_freq = dominant['Frequency (Hz)'].iloc[0]
+        Les nouveaux échantillons horaires s'ajoutent ensuite par engine.update(valeurs)
+        sans recalculer les trames existantes; save_path écrit le .npz compact.
+        """
+        if self.data is None:
+            self.load_data()
+        
+        if column not in self.data.columns:
+            raise ValueError(f"Column '{column}' Not Found.")
         
-        #convertir le spectre en string JSON pour stockage
-        spectrum_data = {
-            'frequencies': frequencies[:100].tolist(),  # Limiter la taille
-            'power': power[:100].tolist()
-        }
+        series = self.data[column].dropna()
+        engine = SpectrogramEngine(window, hop, taper, fs=self.sampling_rate)
+        if 'measured_at' in self.data.columns and len(series):
+            engine.origin = pd.Timestamp(self.data.loc[series.index[0], 'measured_at']).to_datetime64()
+        engine.update(series.to_numpy(dtype=float))
+        
+        print(f"Spectrogram Computed for '{column}': {engine.n_frames} frames x "
+              f"{len(engine.frequencies)} bins")
+        
+        if save_path:
+            engine.save(save_path)
+        return engine
+    
+    def load_spectral_results(self, column):
+        #relit un spectre stocké sans recalculer la FFT
+        with self.db.session():
+            result = self.db.get_spectrum(column)
+        
+        if result is None:
+            raise ValueError(f"No Stored Spectrum for '{column}'.")
+        return result
+    
+    def plot_stored_spectrum(self, column, save_path=None):
         
-        self.db.connect()
+        result = self.load_spectral_results(column)
+        frequencies, power = result['frequencies'], result['power']
         
-        #supprimer les anciens résultats pour cette variable
-        self.db.cursor.execute(
-            "DELETE FROM spectral_analysis WHERE variable_name = %s", (column,)
-        )
+        fig, ax = plt.subplots(figsize=(12, 5))
+        ax.semilogy(frequencies[1:], power[1:], 'b-', linewidth=0.8)
+        ax.set_title(f"Stored Power Spectrum ({result['method']}): {column}",
+                     fontsize=12, fontweight='bold')
+        ax.set_xlabel('Frequency (Hz)')
+        ax.set_ylabel('Power Spectral Density')
+        ax.grid(True, alpha=0.3, which='both')
+        ax.axvline(x=1/24, color='r', linestyle='--', alpha=0.7, label='Daily Cycle (24h)')
+        ax.axvline(x=1/168, color='g', linestyle='--', alpha=0.7, label='Weekly Cycle (168h)')
+        ax.legend()
         
-        #insérer les nouveaux résultats
-        self.db.cursor.execute('''
-            INSERT INTO spectral_analysis 
-            (variable_name, dominant_frequency, power_spectrum_data)
-            VALUES (%s, %s, %s)
-        ''', (column, float(dominant_freq), str(spectrum_data)))
+        plt.tight_layout()
         
-        self.db.connection.commit()
-        self.db.disconnect()
+        if save_path:
+            plt.savefig(save_path, dpi=150, bbox_inches='tight')
+            print(f"Figure Saved: {save_path}")
         
-        print(f"Spectral Results Stored for '{column}'")
+        plt.show()
     
     def plot_fft_spectrum(self, column, save_path=None):
         
@@ -221,8 +651,10 @@ class SpectralAnalyzer:
         if self.data is None:
             self.load_data()
         
+        spectra, _ = self.analyze_columns(columns, method='welch')
+        
         n_cols = len(columns)
-        fig, axes = plt.subplots(n_cols, 2, figsize=(14, 4*n_cols))
+        fig, axes = plt.subplots(n_cols, 2, figsize=(14, 4*n_cols), squeeze=False)
         
         for idx, column in enumerate(columns):
             signal = self.data[column].dropna().values
@@ -234,8 +666,8 @@ class SpectralAnalyzer:
             axes[idx, 0].set_xlabel('Time (h)')
             axes[idx, 0].grid(True, alpha=0.3)
             
-            #spectrum
-            frequencies, power = welch(signal, fs=self.sampling_rate, nperseg=min(256, len(signal)//4))
+            #spectrum (DSP de Welch calculée en bloc par analyze_columns)
+            frequencies, power = spectra[column]
             axes[idx, 1].semilogy(frequencies, power, 'r-', linewidth=0.8)
             axes[idx, 1].set_title(f'{column} - Spectrum', fontsize=10)
             axes[idx, 1].set_xlabel('Frequency (Hz)')
@@ -297,10 +729,10 @@ def test_spectral_analysis():
     dominant_co = analyzer.find_dominant_frequencies('co_gt', n_peaks=5)
     
     print("\n5. Storing Results in the Database..")
-    analyzer.store_spectral_results('temperature')
-    analyzer.store_spectral_results('co_gt')
-    analyzer.store_spectral_results('humidity')
-    analyzer.store_spectral_results('no2_gt')
+    analyzer.store_spectral_results(['temperature', 'co_gt', 'humidity', 'no2_gt'])
+    
+    stored = analyzer.load_spectral_results('temperature')
+    print(f" Reloaded Spectrum: {len(stored['power'])} bins, method={stored['method']}")
    
     print("\n6. Creating FFT Plot..")
     analyzer.plot_fft_spectrum('temperature', save_path='images/fft_temperature.png')
@@ -314,10 +746,63 @@ def test_spectral_analysis():
         save_path='images/spectral_comparison.png'
     )
     
+    print("\n8b. Streaming Welch Power Spectrum..")
+    frequencies, power, _ = analyzer.compute_power_spectrum_streaming('temperature', chunksize=2000)
+    _, batch_power = analyzer.compute_power_spectrum('temperature', method='welch')
+    if len(batch_power) == len(power):
+        print(f" Max Relative Deviation vs Batch Welch: "
+              f"{np.max(np.abs(power - batch_power) / np.maximum(batch_power, 1e-300)):.2e}")
+    
+    print("\n9. Spectrogram (2-week window, daily hop)..")
+    engine = analyzer.compute_spectrogram('temperature', save_path='images/spectrogram_temperature.npz')
+    replay = SpectrogramEngine.load('images/spectrogram_temperature.npz')
+    print(f" Reloaded Spectrogram: {replay.n_frames} frames")
+    
     print("\n" + "=" * 60)
     print("ALL TESTS PASSED!")
     print("=" * 60)
 
 
+def benchmark_fft(sizes=(1_000_003, 1_048_576, 2_000_000), repeats=3):
+    #compare la FFT complexe masquée (ancien chemin) et la FFT réelle, avec ou sans
+    #complétion à une longueur rapide, sur des séries longues (1_000_003 est premier)
+    
+    print("=" * 60)
+    print("FFT Benchmark")
+    print("=" * 60)
+    
+    def complex_path(signal):
+        n = len(signal)
+        result = fft.fft(signal)
+        positive = fft.fftfreq(n) >= 0
+        return np.abs(result[positive]) * 2 / n
+    
+    runs = [
+        ('complex fft + mask', complex_path),
+        ('rfft', lambda signal: real_fft_spectrum(signal, pad_fast=False, workers=1)[1]),
+        ('rfft + fast length', lambda signal: real_fft_spectrum(signal, workers=1)[1]),
+        ('rfft + fast length, all workers', lambda signal: real_fft_spectrum(signal, workers=-1)[1]),
+    ]
+    
+    rng = np.random.default_rng(0)
+    results = {}
+    for n in sizes:
+        t = np.arange(n)
+        signal = np.sin(2 * np.pi * t / 24) + 0.5 * rng.standard_normal(n)
+        
+        print(f"\n n = {n}")
+        for label, run in runs:
+            best = float('inf')
+            for _ in range(repeats):
+                start = time.perf_counter()
+                run(signal)
+                best = min(best, time.perf_counter() - start)
+            results[(n, label)] = best
+            baseline = results[(n, runs[0][0])]
+            print(f"  {label:<32} {best * 1000:>9.1f} ms  (x{baseline / best:.1f})")
+    
+    return results
+
+
 if __name__ == "__main__":
     test_spectral_analysis()